@@ -6,11 +6,91 @@ for security and compliance purposes.
 """
 
 import json
+import queue
+import threading
+from datetime import datetime
 from typing import Optional, Any, Dict
 from fastapi import Request
 from sqlalchemy.orm import Session
 from models import AuditLog, User
 
+# Audit rows are fire-and-forget: requests enqueue them and a single background
+# writer inserts them in batches. Until start_audit_writer() runs (CLI tools, RQ
+# workers) writes stay synchronous on the caller's session.
+AUDIT_QUEUE_MAX = 10000
+AUDIT_BATCH_SIZE = 500
+_audit_queue: "queue.Queue[dict]" = queue.Queue(maxsize=AUDIT_QUEUE_MAX)
+_writer_thread: Optional[threading.Thread] = None
+_writer_stop = threading.Event()
+
+
+def _write_batch(batch: list):
+    from database import SessionLocal, commit_fast
+    sess = SessionLocal()
+    try:
+        sess.bulk_insert_mappings(AuditLog, batch)
+        commit_fast(sess)
+    except Exception as e:
+        print(f"Audit logging failed: {e}")
+        sess.rollback()
+    finally:
+        sess.close()
+
+
+def _writer_loop():
+    while not (_writer_stop.is_set() and _audit_queue.empty()):
+        try:
+            first = _audit_queue.get(timeout=1.0)
+        except queue.Empty:
+            continue
+        batch = [first]
+        while len(batch) < AUDIT_BATCH_SIZE:
+            try:
+                batch.append(_audit_queue.get_nowait())
+            except queue.Empty:
+                break
+        _write_batch(batch)
+
+
+def start_audit_writer():
+    """Start the background audit writer (call once at app startup)."""
+    global _writer_thread
+    if _writer_thread and _writer_thread.is_alive():
+        return
+    _writer_stop.clear()
+    _writer_thread = threading.Thread(target=_writer_loop, name="audit-writer", daemon=True)
+    _writer_thread.start()
+
+
+def stop_audit_writer(timeout: float = 5.0):
+    """Flush pending audit rows and stop the writer (call at app shutdown)."""
+    _writer_stop.set()
+    if _writer_thread:
+        _writer_thread.join(timeout)
+
+
+def enqueue_audit(db: Session, record: dict):
+    """Queue one audit row for the background writer; drops the oldest row when full."""
+    if not (_writer_thread and _writer_thread.is_alive()):
+        try:
+            db.add(AuditLog(**record))
+            db.commit()
+        except Exception as e:
+            print(f"Audit logging failed: {e}")
+            db.rollback()
+        return
+    record.setdefault("created_at", datetime.utcnow())
+    while True:
+        try:
+            _audit_queue.put_nowait(record)
+            return
+        except queue.Full:
+            try:
+                _audit_queue.get_nowait()
+            except queue.Empty:
+                pass
+
+
 class AuditLogger:
     """Utility class for logging audit events."""
     
@@ -26,12 +106,12 @@ class AuditLogger:
         user_agent: Optional[str] = None,
         success: bool = True
     ):
-        """Log an audit event to the database."""
+        """Log an audit event (queued for the background writer when it is running)."""
         try:
             # Convert details dict to JSON string
             details_json = json.dumps(details) if details else None
             
-            audit_log = AuditLog(
+            enqueue_audit(db, dict(
                 user_id=user_id,
                 action=action,
                 resource_type=resource_type,
@@ -40,15 +120,11 @@ class AuditLogger:
                 ip_address=ip_address,
                 user_agent=user_agent,
                 success=success
-            )
-            
-            db.add(audit_log)
-            db.commit()
+            ))
             
         except Exception as e:
             # Don't fail the main operation if audit logging fails
             print(f"Audit logging failed: {e}")
-            db.rollback()
     
     @staticmethod
     def log_user_action(
@@ -1,6 +1,6 @@
 from typing import Optional, Any, Dict
 from sqlalchemy.orm import Session
-from models import AuditLog
+from audit_logger import enqueue_audit
 
 
 def log_audit(
@@ -16,7 +16,7 @@ def log_audit(
     user_agent: Optional[str] = None,
 ):
     try:
-        log = AuditLog(
+        enqueue_audit(db, dict(
             user_id=user_id,
             action=action,
             resource_type=resource_type,
@@ -25,12 +25,6 @@ def log_audit(
             ip_address=ip_address,
             user_agent=user_agent,
             success=success,
-        )
-        db.add(log)
-        db.commit()
+        ))
     except Exception:
-        try:
-            db.rollback()
-        except Exception:
-            pass
-
+        pass
@@ -1,3 +1,5 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
@@ -26,6 +28,14 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+# bcrypt releases the GIL while hashing, so independent hashes can overlap
+_hash_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 2, thread_name_prefix="pwhash")
+
+def get_password_hashes(*passwords):
+    """Hash several secrets concurrently; empty values map to None."""
+    futures = [_hash_executor.submit(pwd_context.hash, p) if p else None for p in passwords]
+    return [f.result() if f else None for f in futures]
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -62,3 +72,15 @@ def get_current_user(
     if user is None:
         raise credentials_exception
     return user
+
+def require_admin(current_user: User = Depends(get_current_user)):
+    """
+    Resolve the caller via get_current_user (which checks out the request's
+    DB session to load the User) and reject non-admins with a 403.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required",
+        )
+    return current_user
@@ -6,6 +6,12 @@ from pathlib import Path
 from database import SessionLocal
 from models import Server, User
 from sqlalchemy.orm import Session
+from rq_queue import get_redis, get_async_redis
+
+# Shared across uvicorn workers so every admin sees the same feed
+UI_NOTIFICATIONS_KEY = "auth:notifications"
+UI_NOTIFICATIONS_MAX = 100
+UI_NOTIFICATIONS_CHANNEL = "auth:notifications:events"
 
 class AuthLogger:
     """
@@ -44,8 +50,10 @@ class AuthLogger:
         self.logger.addHandler(file_handler)
         self.logger.addHandler(console_handler)
         
-        # UI notification storage (in-memory for now, could be database)
+        # UI notifications live in a Redis list; the in-memory list is only
+        # a per-process fallback for when Redis is unreachable
         self.ui_notifications = []
+        self._redis = None
     
     def log_auth_attempt(self, 
                         server_name: str, 
@@ -90,11 +98,7 @@ class AuthLogger:
             "details": details or {}
         }
         
-        self.ui_notifications.append(ui_notification)
-        
-        # Keep only last 100 notifications to avoid memory issues
-        if len(self.ui_notifications) > 100:
-            self.ui_notifications = self.ui_notifications[-100:]
+        self._store_ui_notification(ui_notification)
     
     def log_ssh_key_deployment(self,
                               server_name: str,
@@ -137,11 +141,7 @@ class AuthLogger:
             "details": details or {}
         }
         
-        self.ui_notifications.append(ui_notification)
-        
-        # Keep only last 100 notifications
-        if len(self.ui_notifications) > 100:
-            self.ui_notifications = self.ui_notifications[-100:]
+        self._store_ui_notification(ui_notification)
     
     def log_script_execution_auth(self,
                                  script_name: str,
@@ -187,11 +187,7 @@ class AuthLogger:
             "details": details or {}
         }
         
-        self.ui_notifications.append(ui_notification)
-        
-        # Keep only last 100 notifications
-        if len(self.ui_notifications) > 100:
-            self.ui_notifications = self.ui_notifications[-100:]
+        self._store_ui_notification(ui_notification)
     
     def _format_ui_message(self, server_name: str, auth_method: str, success: bool, details: Optional[Dict[str, Any]]) -> str:
         """Format user-friendly message for UI"""
@@ -217,12 +213,45 @@ class AuthLogger:
             error_msg = details.get('error', 'Unknown error') if details else 'Unknown error'
             return f"❌ Script '{script_name}' failed on {server_name} using {auth_method.upper()}: {error_msg}"
     
+    def _get_redis(self):
+        if self._redis is None:
+            self._redis = get_redis()
+        return self._redis
+    
+    def _store_ui_notification(self, notification: Dict[str, Any]):
+        """Push a notification onto the shared Redis list, capped to the newest entries"""
+        try:
+            payload = json.dumps(notification, default=str)
+            pipe = self._get_redis().pipeline()
+            pipe.lpush(UI_NOTIFICATIONS_KEY, payload)
+            pipe.ltrim(UI_NOTIFICATIONS_KEY, 0, UI_NOTIFICATIONS_MAX - 1)
+            pipe.publish(UI_NOTIFICATIONS_CHANNEL, payload)
+            pipe.execute()
+        except Exception:
+            self.ui_notifications.append(notification)
+            if len(self.ui_notifications) > UI_NOTIFICATIONS_MAX:
+                self.ui_notifications = self.ui_notifications[-UI_NOTIFICATIONS_MAX:]
+    
     def get_ui_notifications(self, limit: int = 50) -> list:
-        """Get recent UI notifications for display"""
-        return self.ui_notifications[-limit:]
+        """Get recent UI notifications for display (oldest first)"""
+        try:
+            raw = self._get_redis().lrange(UI_NOTIFICATIONS_KEY, 0, max(0, limit - 1))
+            return [json.loads(item) for item in reversed(raw)]
+        except Exception:
+            return self.ui_notifications[-limit:]
+    
+    async def subscribe_ui_notifications(self):
+        """Return an asyncio Redis pub/sub handle that receives each new UI notification as JSON"""
+        pubsub = get_async_redis().pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(UI_NOTIFICATIONS_CHANNEL)
+        return pubsub
     
     def clear_ui_notifications(self):
         """Clear UI notifications"""
+        try:
+            self._get_redis().delete(UI_NOTIFICATIONS_KEY)
+        except Exception:
+            pass
         self.ui_notifications.clear()
 
 # Global instance
@@ -57,6 +57,16 @@ def get_db():
             pass
         db.close()
 
+def commit_fast(db):
+    """Commit a low-value write (status flips, audit rows) without waiting for the WAL flush.
+
+    Postgres only: a crash may lose the last few such commits, never corrupt data.
+    SQLite already runs with synchronous=NORMAL below.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SET LOCAL synchronous_commit = off"))
+    db.commit()
+
 if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
     # Configure SQLite for better concurrency
     try:
@@ -5,6 +5,8 @@ from models import Base
 from routers import auth, users, servers, server_groups, terminal, scripts, schedules, reports, settings as settings_router, audit, marketplace, health, notifications
 from routers import workflows
 from scheduler import start_scheduler, stop_scheduler
+from audit_logger import start_audit_writer, stop_audit_writer
+from ssh_key_utils import ssh_key_index
 import logging
 import subprocess
 import os
@@ -69,6 +71,17 @@ def on_startup():
         print(f"DEBUG: Failed to run Alembic migrations: {e}")
         # Continue startup even if migrations fail
     
+    try:
+        # Build the SSH key index once so the first /servers/ssh-keys call is warm
+        ssh_key_index()
+    except Exception as e:
+        print(f"DEBUG: Failed to index SSH keys: {e}")
+    
+    try:
+        start_audit_writer()
+    except Exception as e:
+        print(f"DEBUG: Failed to start audit writer: {e}")
+    
     try:
         print("DEBUG: Starting scheduler...")
         start_scheduler()
@@ -84,3 +97,7 @@ def on_shutdown():
         stop_scheduler()
     except Exception:
         pass
+    try:
+        stop_audit_writer()
+    except Exception:
+        pass
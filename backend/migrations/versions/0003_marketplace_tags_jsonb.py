@@ -0,0 +1,33 @@
+"""marketplace_scripts.tags as JSONB with GIN index
+
+Revision ID: 0003_mp_tags_jsonb
+Revises: 0002_marketplace
+Create Date: 2025-10-01 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0003_mp_tags_jsonb'
+down_revision = '0002_marketplace'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+    if dialect == 'postgresql':
+        op.execute("ALTER TABLE marketplace_scripts ALTER COLUMN tags TYPE JSONB USING NULLIF(tags, '')::jsonb")
+        op.execute("CREATE INDEX IF NOT EXISTS ix_mp_tags_gin ON marketplace_scripts USING gin (tags)")
+    else:
+        # SQLite stores JSON as TEXT; existing JSON-encoded values remain readable
+        pass
+
+
+def downgrade():
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_mp_tags_gin")
+        op.execute("ALTER TABLE marketplace_scripts ALTER COLUMN tags TYPE TEXT USING tags::text")
@@ -0,0 +1,30 @@
+"""unique index on scripts.name
+
+Revision ID: 0004_unique_script_name
+Revises: 0003_mp_tags_jsonb
+Create Date: 2025-10-02 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0004_unique_script_name'
+down_revision = '0003_mp_tags_jsonb'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Names are already kept unique by the API; this lets the DB enforce it
+    # and backs INSERT ... ON CONFLICT (name) in the marketplace import.
+    # Rename any pre-existing duplicates (all but the oldest row per name) so
+    # the index can be built; rows are kept since executions reference them.
+    op.execute(
+        "UPDATE scripts SET name = name || ' (' || CAST(id AS VARCHAR) || ')' "
+        "WHERE id NOT IN (SELECT MIN(id) FROM scripts GROUP BY name)"
+    )
+    op.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_scripts_name ON scripts (name)")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_scripts_name")
@@ -0,0 +1,30 @@
+"""index schedules.next_run_at
+
+Revision ID: 0005_schedule_next_run_idx
+Revises: 0004_unique_script_name
+Create Date: 2025-10-03 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0005_schedule_next_run_idx'
+down_revision = '0004_unique_script_name'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # next_run_at is only recomputed on timing changes and after a firing,
+    # so "due schedules" lookups can range-scan it instead of re-running croniter.
+    try:
+        op.execute("CREATE INDEX IF NOT EXISTS ix_schedules_next_run_at ON schedules (next_run_at)")
+    except Exception:
+        pass
+
+
+def downgrade():
+    try:
+        op.execute("DROP INDEX IF EXISTS ix_schedules_next_run_at")
+    except Exception:
+        pass
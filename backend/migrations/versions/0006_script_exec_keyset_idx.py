@@ -0,0 +1,44 @@
+"""composite indexes for script_executions keyset pagination
+
+Revision ID: 0006_script_exec_keyset_idx
+Revises: 0005_schedule_next_run_idx
+Create Date: 2025-10-04 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0006_script_exec_keyset_idx'
+down_revision = '0005_schedule_next_run_idx'
+branch_labels = None
+depends_on = None
+
+# ORDER BY id DESC alone is already served by the primary key (scanned backwards);
+# these cover the status/server filtered variants of the same keyset query.
+_INDEXES = (
+    ("ix_script_exec_status_id", "script_executions (status, id DESC)"),
+    ("ix_script_exec_server_id", "script_executions (server_id, id DESC)"),
+)
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        # CONCURRENTLY cannot run inside the migration transaction
+        with op.get_context().autocommit_block():
+            for name, target in _INDEXES:
+                op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {target}")
+    else:
+        for name, target in _INDEXES:
+            try:
+                op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+            except Exception:
+                pass
+
+
+def downgrade():
+    for name, _ in _INDEXES:
+        try:
+            op.execute(f"DROP INDEX IF EXISTS {name}")
+        except Exception:
+            pass
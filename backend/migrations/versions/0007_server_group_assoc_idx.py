@@ -0,0 +1,44 @@
+"""composite indexes for server_group_associations
+
+Revision ID: 0007_server_group_assoc_idx
+Revises: 0006_script_exec_keyset_idx
+Create Date: 2025-10-05 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0007_server_group_assoc_idx'
+down_revision = '0006_script_exec_keyset_idx'
+branch_labels = None
+depends_on = None
+
+# The association table only had its surrogate PK. Server.groups selectinloads
+# probe it by server_id; group membership checks and group filters by group_id.
+_INDEXES = (
+    ("ix_server_group_assoc_server_group", "server_group_associations (server_id, group_id)"),
+    ("ix_server_group_assoc_group_server", "server_group_associations (group_id, server_id)"),
+)
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        # CONCURRENTLY cannot run inside the migration transaction
+        with op.get_context().autocommit_block():
+            for name, target in _INDEXES:
+                op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {target}")
+    else:
+        for name, target in _INDEXES:
+            try:
+                op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+            except Exception:
+                pass
+
+
+def downgrade():
+    for name, _ in _INDEXES:
+        try:
+            op.execute(f"DROP INDEX IF EXISTS {name}")
+        except Exception:
+            pass
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Float, JSON
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
@@ -67,7 +68,7 @@ class Script(Base):
     __tablename__ = "scripts"
     
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, nullable=False)
+    name = Column(String, unique=True, index=True, nullable=False)
     description = Column(Text, nullable=True)
     content = Column(Text, nullable=False)
     # Optional metadata/organization fields
@@ -116,7 +117,7 @@ class MarketplaceScript(Base):
     script_type = Column(String, default="shell")  # "shell", "powershell", "python", etc.
     content = Column(Text, nullable=False)
     parameters = Column(Text, nullable=True)  # JSON string for parameters
-    tags = Column(Text, nullable=True)  # JSON array of tags
+    tags = Column(JSON().with_variant(JSONB, "postgresql"), nullable=True)  # List of tags (JSONB + GIN index on Postgres)
     author = Column(String, nullable=True)
     version = Column(String, default="1.0.0")
     downloads = Column(Integer, default=0)
@@ -156,7 +157,7 @@ class Schedule(Base):
     timezone = Column(String, default="UTC")
     enabled = Column(Boolean, default=True)
     # Track scheduling
-    next_run_at = Column(DateTime, nullable=True)
+    next_run_at = Column(DateTime, nullable=True, index=True)
     last_run_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
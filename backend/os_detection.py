@@ -7,6 +7,22 @@ import re
 from typing import Tuple, Optional
 from secrets_vault import SecretsVault
 
+def classify_uname(output: str) -> Optional[str]:
+    """
+    Map `uname -s` output to an OS type.
+    
+    Returns:
+        'linux', 'macos', 'freebsd', or None if unrecognized
+    """
+    output = output.lower()
+    if "linux" in output:
+        return "linux"
+    elif "darwin" in output:
+        return "macos"
+    elif "freebsd" in output:
+        return "freebsd"
+    return None
+
 def detect_os_via_ssh(ip: str, username: str, password: str = None, ssh_key_path: str = None) -> Tuple[Optional[str], str]:
     """
     Detect OS by connecting via SSH and running detection commands.
@@ -62,12 +78,9 @@ def detect_os_via_ssh(ip: str, username: str, password: str = None, ssh_key_path
                 output = stdout.read().decode('utf-8', errors='ignore').strip().lower()
                 
                 if os_type == "unix":
-                    if "linux" in output:
-                        return "linux", "ssh_connect"
-                    elif "darwin" in output:
-                        return "macos", "ssh_connect"
-                    elif "freebsd" in output:
-                        return "freebsd", "ssh_connect"
+                    unix_os = classify_uname(output)
+                    if unix_os:
+                        return unix_os, "ssh_connect"
                 elif os_type in ["windows", "windows_alt"]:
                     if "windows" in output:
                         return "windows", "ssh_connect"
@@ -1,48 +1,76 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import time
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from auth import require_admin
 from database import get_db
-from auth import get_current_user
-from models import User
-from auth_logger import auth_logger
+from auth_logger import auth_logger, UI_NOTIFICATIONS_MAX
 
-router = APIRouter()
+# Only admins can view or clear auth notifications
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+_HEARTBEAT_SECONDS = 15
+_CACHE_TTL_SECONDS = 3
+# One snapshot of the full capped feed, sliced per request
+_notifications_cache = {"at": None, "items": []}
 
 @router.get("/auth-notifications")
-def get_auth_notifications(
-    limit: int = 50,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
+def get_auth_notifications(limit: int = Query(50, ge=1, le=UI_NOTIFICATIONS_MAX)):
     """
     Get recent authentication notifications for UI display
     """
-    # Only admins can view auth notifications
-    if current_user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only admins can view authentication notifications"
-        )
-    
-    notifications = auth_logger.get_ui_notifications(limit)
+    now = time.monotonic()
+    cached_at = _notifications_cache["at"]
+    if cached_at is None or now - cached_at >= _CACHE_TTL_SECONDS:
+        _notifications_cache.update(at=now, items=auth_logger.get_ui_notifications(UI_NOTIFICATIONS_MAX))
+    notifications = _notifications_cache["items"][-limit:]
     return {
         "notifications": notifications,
         "total": len(notifications)
     }
 
-@router.delete("/auth-notifications")
-def clear_auth_notifications(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
+@router.get("/auth-notifications/stream")
+async def stream_auth_notifications(db: Session = Depends(get_db)):
     """
-    Clear authentication notifications
+    Push new authentication notifications as Server-Sent Events
     """
-    # Only admins can clear notifications
-    if current_user.role != "admin":
+    # The admin check's session would otherwise hold a pooled DB connection
+    # for as long as the stream stays open
+    db.close()
+    try:
+        pubsub = await auth_logger.subscribe_ui_notifications()
+    except Exception:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only admins can clear notifications"
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Notification stream unavailable"
         )
-    
+
+    # Waits on the event loop, so open streams don't tie up threadpool workers
+    async def event_stream():
+        try:
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=_HEARTBEAT_SECONDS)
+                if message is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                data = message["data"]
+                if isinstance(data, bytes):
+                    data = data.decode("utf-8")
+                yield f"data: {data}\n\n"
+        finally:
+            await pubsub.aclose()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.delete("/auth-notifications")
+def clear_auth_notifications():
+    """
+    Clear authentication notifications
+    """
     auth_logger.clear_ui_notifications()
+    _notifications_cache.update(at=None, items=[])
     return {"message": "Notifications cleared successfully"}
@@ -1,59 +1,118 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 import os
+import re
 import smtplib
 from email.message import EmailMessage
+from html import escape as _e
 
 from database import get_db
 from models import ScriptExecution, User, Script, Server, Settings
 from auth import get_current_user
+from utils_logging import get_logger, kv
+from smtp_pool import smtp_connection
 
 router = APIRouter()
-
-
-def _render_digest(executions: list[ScriptExecution]) -> tuple[str, str]:
-    total = len(executions)
-    completed = sum(1 for e in executions if e.status == 'completed')
-    failed = sum(1 for e in executions if e.status == 'failed')
-    running = sum(1 for e in executions if e.status == 'running')
-
-    # Text
-    lines = [
-        f"biRun Daily Digest",
-        f"Total executions: {total}",
-        f"Completed: {completed}",
-        f"Failed: {failed}",
-        f"Running: {running}",
-        "",
-        "Recent failures:",
-    ]
-    for e in executions:
-        if e.status == 'failed':
-            lines.append(f"- {e.script.name if e.script else e.script_id} on {e.server.name if e.server else e.server_id} at {e.started_at}: {str(e.error)[:160] if e.error else ''}")
-    text_body = "\n".join(lines)
-
-    # HTML
-    html = [
-        "<html><body style='font-family:Arial, sans-serif'>",
-        "<h2>biRun Daily Digest</h2>",
-        f"<p><strong>Total:</strong> {total} &nbsp; <strong>Completed:</strong> {completed} &nbsp; <strong>Failed:</strong> {failed} &nbsp; <strong>Running:</strong> {running}</p>",
-        "<h3>Recent failures</h3>",
-        "<table cellpadding='6' cellspacing='0' border='1' style='border-collapse:collapse;border-color:#ddd'>",
-        "<thead><tr><th>Script</th><th>Server</th><th>Started</th><th>Error</th></tr></thead><tbody>",
-    ]
-    for e in executions:
-        if e.status == 'failed':
-            html.append(
-                f"<tr><td>{(e.script.name if e.script else e.script_id)}</td><td>{(e.server.name if e.server else e.server_id)}</td><td>{e.started_at}</td><td>{(str(e.error)[:200] if e.error else '')}</td></tr>"
-            )
-    html.append("</tbody></table>")
-    html.append("</body></html>")
-    return text_body, "".join(html)
+logger = get_logger(__name__)
+
+# Upper bound on failure rows rendered into a digest; overridable via Settings.digest_max_rows
+_DIGEST_MAX_ROWS = 200
+# Per-recipient sends abort once this many were attempted and >= 1/3 failed
+_DIGEST_STOP_LOSS_MIN = 30
+_SPLIT = re.compile(r"[,;\s]+")
+_EMAIL = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+_ROW_TMPL = "<tr><td>{s}</td><td>{sv}</td><td>{t}</td><td>{err}</td></tr>"
+_TEXT_HEADER_TMPL = "biRun Daily Digest\nTotal executions: {t}\nCompleted: {c}\nFailed: {f}\nRunning: {r}\n\nRecent failures:\n"
+_HTML_HEADER = "<html><body style='font-family:Arial, sans-serif'><h2>biRun Daily Digest</h2>"
+_HTML_COUNTS_TMPL = "<p><strong>Total:</strong> {t} &nbsp; <strong>Completed:</strong> {c} &nbsp; <strong>Failed:</strong> {f} &nbsp; <strong>Running:</strong> {r}</p>"
+_HTML_TABLE_OPEN = (
+    "<h3>Recent failures</h3>"
+    "<table cellpadding='6' cellspacing='0' border='1' style='border-collapse:collapse;border-color:#ddd'>"
+    "<thead><tr><th>Script</th><th>Server</th><th>Started</th><th>Error</th></tr></thead><tbody>"
+)
+_HTML_TABLE_CLOSE = "</tbody></table>"
+_HTML_FOOTER = "</body></html>"
+
+
+def _render_digest(counts: dict, failed_rows: list) -> tuple[str, str]:
+    """Render the digest from per-status counts and projected failed rows
+    (see send_daily_digest for the columns)."""
+    total = sum(counts.values())
+    completed = counts.get('completed', 0)
+    failed = counts.get('failed', 0)
+    running = counts.get('running', 0)
+    text_rows = []
+    html_rows = []
+    # Single pass: render both failure fragments as we go
+    for r in failed_rows:
+        script = r.script_name or r.script_id
+        server = r.server_name or r.server_id
+        text_rows.append(f"- {script} on {server} at {r.started_at}: {str(r.error)[:160] if r.error else ''}")
+        html_rows.append(_ROW_TMPL.format(
+            s=_e(str(script)),
+            sv=_e(str(server)),
+            t=_e(str(r.started_at)),
+            err=_e(str(r.error or "")[:200]),
+        ))
+
+    more = failed - len(failed_rows)
+    more_text = f"\n...and {more} more" if more > 0 else ""
+    more_html = f"<p>...and {more} more</p>" if more > 0 else ""
+    text_body = _TEXT_HEADER_TMPL.format(t=total, c=completed, f=failed, r=running) + "\n".join(text_rows) + more_text
+    html_body = (
+        _HTML_HEADER
+        + _HTML_COUNTS_TMPL.format(t=total, c=completed, f=failed, r=running)
+        + _HTML_TABLE_OPEN
+        + "".join(html_rows)
+        + _HTML_TABLE_CLOSE
+        + more_html
+        + _HTML_FOOTER
+    )
+    return text_body, html_body
+
+
+def _parse_recipients(raw: str) -> list[str]:
+    """Split a comma/semicolon/whitespace separated list, keeping only local@domain addresses."""
+    return [x for x in _SPLIT.split(raw) if x and _EMAIL.match(x)]
+
+
+def _send_digest_email(smtp_host: str, smtp_port: int, smtp_user: str, smtp_pass: str, msg: EmailMessage, from_email: str, to_emails: list[str]):
+    """Deliver the digest after the response has been sent; failures are logged only.
+
+    A single recipient gets the message as-is. Multiple recipients get one
+    envelope each so addresses are not exposed to each other; the MIME body is
+    serialized once and the same bytes are reused for every send.
+    """
+    sent = failed = 0
+    try:
+        with smtp_connection(smtp_host, smtp_port, smtp_user, smtp_pass) as server:
+            if len(to_emails) == 1:
+                server.send_message(msg)
+                sent = 1
+            else:
+                raw = msg.as_bytes()
+                for rcpt in to_emails:
+                    try:
+                        server.sendmail(from_email, [rcpt], raw)
+                        sent += 1
+                    except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException) as e:
+                        failed += 1
+                        logger.warning(f"digest recipient failed {kv(to=rcpt, error=str(e))}")
+                    # Stop-loss: a third of a sizeable batch failing means the server is rejecting us
+                    attempted = sent + failed
+                    if attempted >= _DIGEST_STOP_LOSS_MIN and failed * 3 >= attempted:
+                        logger.error(f"digest batch aborted {kv(sent=sent, failed=failed, remaining=len(to_emails) - attempted)}")
+                        break
+        logger.info(f"digest sent {kv(sent=sent, failed=failed)}")
+    except Exception as e:
+        logger.error(f"digest send failed {kv(host=smtp_host, sent=sent, error=str(e))}")
 
 
 @router.post("/daily-digest")
 def send_daily_digest(
+    background_tasks: BackgroundTasks,
     to: str | None = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -61,28 +120,44 @@ def send_daily_digest(
     if current_user.role != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only admins can send digest")
 
-    since = datetime.utcnow() - timedelta(days=1)
-    q = db.query(ScriptExecution).options(
-        joinedload(ScriptExecution.script),
-        joinedload(ScriptExecution.server),
-        joinedload(ScriptExecution.executor),
-    ).filter(ScriptExecution.started_at >= since)
     st = db.query(Settings).first()
-    if getattr(st, 'digest_only_failed', False):
-        q = q.filter(ScriptExecution.status == 'failed')
-    executions = q.order_by(ScriptExecution.started_at.desc()).all()
-
-    text_body, html_body = _render_digest(executions)
+    since = datetime.utcnow() - timedelta(days=1)
+    only_failed = bool(getattr(st, 'digest_only_failed', False))
+
+    # Counters come from a GROUP BY; only failed rows are transferred for the detail list
+    counts_q = db.query(ScriptExecution.status, func.count(ScriptExecution.id)).filter(
+        ScriptExecution.started_at >= since
+    )
+    if only_failed:
+        counts_q = counts_q.filter(ScriptExecution.status == 'failed')
+    counts = dict(counts_q.group_by(ScriptExecution.status).all())
+
+    # Only the columns the digest renders; avoids hydrating script content and full entities
+    failed_rows = db.query(
+        ScriptExecution.started_at,
+        ScriptExecution.error,
+        ScriptExecution.script_id,
+        ScriptExecution.server_id,
+        Script.name.label("script_name"),
+        Server.name.label("server_name"),
+    ).outerjoin(Script, ScriptExecution.script_id == Script.id).outerjoin(
+        Server, ScriptExecution.server_id == Server.id
+    ).filter(
+        ScriptExecution.started_at >= since,
+        ScriptExecution.status == 'failed',
+    ).order_by(ScriptExecution.started_at.desc()).limit(
+        int(getattr(st, 'digest_max_rows', None) or _DIGEST_MAX_ROWS)
+    ).all()
+
+    text_body, html_body = _render_digest(counts, failed_rows)
 
     # SMTP configuration
-    st = db.query(Settings).first()
     smtp_host = getattr(st, 'smtp_host', None)
     smtp_port = int(getattr(st, 'smtp_port', 587) or 587)
     smtp_user = getattr(st, 'smtp_user', None)
     smtp_pass = getattr(st, 'smtp_pass', None)
     from_email = getattr(st, 'from_email', None) or (smtp_user or "no-reply@example.com")
-    to_emails = (to or (getattr(st, 'digest_to_emails', '') or '')).split(",")
-    to_emails = [x.strip() for x in to_emails if x.strip()]
+    to_emails = _parse_recipients(to or getattr(st, 'digest_to_emails', '') or '')
 
     if not smtp_host or not smtp_user or not smtp_pass or not to_emails:
         # Return preview instead of sending
@@ -100,17 +175,12 @@ def send_daily_digest(
     msg = EmailMessage()
     msg["Subject"] = "biRun Daily Digest"
     msg["From"] = from_email
-    msg["To"] = ", ".join(to_emails)
+    # Multi-recipient digests are sent one envelope per address with identical bytes
+    msg["To"] = to_emails[0] if len(to_emails) == 1 else "undisclosed-recipients:;"
     msg.set_content(text_body)
     msg.add_alternative(html_body, subtype='html')
 
-    try:
-        with smtplib.SMTP(smtp_host, smtp_port, timeout=15) as server:
-            server.starttls()
-            server.login(smtp_user, smtp_pass)
-            server.send_message(msg)
-        return {"sent": True, "to": to_emails, "count": len(executions)}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to send email: {e}")
+    background_tasks.add_task(_send_digest_email, smtp_host, smtp_port, smtp_user, smtp_pass, msg, from_email, to_emails)
+    return {"sent": "queued", "to": to_emails, "count": sum(counts.values())}
 
 
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from typing import List
 from database import get_db
@@ -16,7 +17,7 @@ except Exception:  # Python <3.9 fallback not provided; default UTC
 router = APIRouter()
 
 @router.post("/", response_model=ScheduleResponse)
-def create_schedule(payload: ScheduleCreate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+def create_schedule(payload: ScheduleCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
     # Default timezone to user's local if not provided
     # Frontend sends the browser tz; fallback to Europe/Istanbul if configured via header; else UTC
     browser_tz = None
@@ -52,19 +53,31 @@ def create_schedule(payload: ScheduleCreate, db: Session = Depends(get_db), curr
     
     log_audit(db, action="schedule_create", resource_type="schedule", resource_id=schedule.id, user_id=current_user.id, details={"name": schedule.name})
     
-    # Sync schedules to APScheduler
-    try:
-        from scheduler import sync_schedules
-        sync_schedules()
-    except Exception as e:
-        print(f"WARN: Failed to sync schedules after create: {e}")
+    # Sync schedules to APScheduler after the response has been sent
+    from scheduler import sync_schedule_one
+    background_tasks.add_task(sync_schedule_one, schedule.id)
     
     return schedule
 
 @router.get("/", response_model=ScheduleListResponse)
 def list_schedules(db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    q = db.query(Schedule).order_by(Schedule.created_at.desc())
-    items = q.all()
+    # Only the ScheduleResponse fields, returned as plain mappings (no ORM instances)
+    stmt = select(
+        Schedule.id,
+        Schedule.name,
+        Schedule.script_id,
+        Schedule.target_type,
+        Schedule.target_id,
+        Schedule.cron_expression,
+        Schedule.interval_seconds,
+        Schedule.timezone,
+        Schedule.enabled,
+        Schedule.next_run_at,
+        Schedule.last_run_at,
+        Schedule.created_by,
+        Schedule.created_at,
+    ).order_by(Schedule.created_at.desc())
+    items = db.execute(stmt).mappings().all()
     return {"schedules": items, "total": len(items)}
 
 @router.get("/{schedule_id}", response_model=ScheduleResponse)
@@ -75,7 +88,7 @@ def get_schedule(schedule_id: int, db: Session = Depends(get_db), current_user=D
     return schedule
 
 @router.put("/{schedule_id}", response_model=ScheduleResponse)
-def update_schedule(schedule_id: int, payload: ScheduleUpdate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+def update_schedule(schedule_id: int, payload: ScheduleUpdate, background_tasks: BackgroundTasks, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
     schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
     if not schedule:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Schedule not found")
@@ -90,7 +103,8 @@ def update_schedule(schedule_id: int, payload: ScheduleUpdate, db: Session = Dep
     # Recalculate next_run_at if timing fields changed
     if timing_changed:
         from datetime import datetime, timezone
-        from scheduler import _compute_next_run
+        from scheduler import _compute_next_run, _ITER_CACHE
+        _ITER_CACHE.pop(schedule.id, None)
         now = datetime.utcnow().replace(tzinfo=timezone.utc)
         schedule.next_run_at = _compute_next_run(schedule, now)
     
@@ -98,17 +112,14 @@ def update_schedule(schedule_id: int, payload: ScheduleUpdate, db: Session = Dep
     db.refresh(schedule)
     log_audit(db, action="schedule_update", resource_type="schedule", resource_id=schedule.id, user_id=current_user.id, details={"name": schedule.name})
     
-    # Sync schedules to APScheduler
-    try:
-        from scheduler import sync_schedules
-        sync_schedules()
-    except Exception as e:
-        print(f"WARN: Failed to sync schedules after update: {e}")
+    # Sync schedules to APScheduler after the response has been sent
+    from scheduler import sync_schedule_one
+    background_tasks.add_task(sync_schedule_one, schedule.id)
     
     return schedule
 
 @router.delete("/{schedule_id}")
-def delete_schedule(schedule_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+def delete_schedule(schedule_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
     schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
     if not schedule:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Schedule not found")
@@ -116,15 +127,17 @@ def delete_schedule(schedule_id: int, db: Session = Depends(get_db), current_use
     schedule_name = schedule.name
     db.delete(schedule)
     db.commit()
+    try:
+        from scheduler import _ITER_CACHE
+        _ITER_CACHE.pop(schedule_id, None)
+    except Exception:
+        pass
     
     log_audit(db, action="schedule_delete", resource_type="schedule", resource_id=schedule_id, user_id=current_user.id, details={"name": schedule_name})
     
-    # Sync schedules to APScheduler
-    try:
-        from scheduler import sync_schedules
-        sync_schedules()
-    except Exception as e:
-        print(f"WARN: Failed to sync schedules after delete: {e}")
+    # Sync schedules to APScheduler after the response has been sent
+    from scheduler import sync_schedule_one
+    background_tasks.add_task(sync_schedule_one, schedule_id, deleted=True)
     
     return {"detail": "deleted"}
 
@@ -151,16 +164,27 @@ def preview_cron(
             tzinfo = ZoneInfo(tz)
         except Exception:
             tzinfo = ZoneInfo("UTC")
-    # Base time in specified tz (aware if possible)
+    # Base time in specified tz; croniter gets naive wall-clock time and results are
+    # localized afterwards, since tz-aware input is unreliable around DST changes
     now = datetime.now(tzinfo) if tzinfo else datetime.utcnow()
-    try:
-        it = croniter(expr_norm, now)
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Invalid cron expression: {e}")
-    runs = []
-    for _ in range(count):
-        dt = it.get_next(datetime)
-        if tzinfo and dt.tzinfo is None:
-            dt = dt.replace(tzinfo=tzinfo)
-        runs.append(dt.isoformat())
+    from scheduler import _FAST, _localize
+    fast = _FAST.get(expr_norm)
+    if fast is None:
+        try:
+            it = croniter(expr_norm, now.replace(tzinfo=None))
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Invalid cron expression: {e}")
+    if fast is not None:
+        naive_runs = []
+        dt = now.replace(tzinfo=None)
+        for _ in range(count):
+            dt = fast(dt)
+            naive_runs.append(dt)
+    else:
+        naive_runs = [it.get_next(datetime) for _ in range(count)]
+    # tzinfo is fixed per request, so pick the loop once instead of branching per date
+    if tzinfo:
+        runs = [_localize(dt, tzinfo).isoformat() for dt in naive_runs]
+    else:
+        runs = [dt.isoformat() for dt in naive_runs]
     return {"next": runs, "now": now.isoformat(), "tz": tz, "expr": expr_norm}
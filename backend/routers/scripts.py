@@ -1,54 +1,91 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.responses import StreamingResponse, JSONResponse
-from sqlalchemy.orm import Session, joinedload
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.orm import Session, joinedload, load_only, raiseload, selectinload
 from typing import List
+from collections import defaultdict
+from dataclasses import dataclass
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import chain, islice
 from database import get_db
-from models import Script, ScriptExecution, User, Server, ServerGroup, WorkflowNode, Settings
+from models import Script, ScriptExecution, User, Server, ServerGroup, ServerGroupAssociation, WorkflowNode, Settings
 from schemas import (
     ScriptResponse, ScriptCreate, ScriptUpdate, ScriptListResponse,
-    ScriptExecutionResponse, ScriptExecutionCreate, ScriptExecutionListResponse, SettingsResponse
+    ScriptExecutionResponse, ScriptExecutionCreate, ScriptExecutionListResponse, SettingsResponse,
+    ScriptBatchExecute
 )
-from auth import get_current_user
+from auth import get_current_user, require_admin
 from audit_logger import AuditLogger, AuditActions
 from audit_utils import log_audit
-from sqlalchemy import func
+from sqlalchemy import func, select
 import os
+import sys
 import paramiko
 import io
-import time
+import uuid
 import io
 import csv
-from datetime import datetime, timezone
+import orjson
+from datetime import date, datetime, timedelta, timezone
 from secrets_vault import SecretsVault
-from auth_logger import auth_logger
 from ssh_key_utils import detect_key_type_from_file, get_paramiko_key_class
 from rq_queue import get_queue
-from tasks import execute_script_job
+from tasks import execute_script_job, mark_long_running_task
 from utils_logging import get_logger, kv
+from rq import Queue
 from rq.job import Job
 from rq_queue import get_redis
+from settings_cache import get_settings_cached, invalidate_settings_cache
 from sqlalchemy import text
 from sqlalchemy.exc import ProgrammingError, OperationalError
 
 router = APIRouter()
+logger = get_logger(__name__)
+
+# Compiled-statement cache shared by this router's primary-key lookups, so the
+# joinedload variants are compiled once per worker rather than competing for
+# slots in the engine-wide cache.
+_COMPILED_CACHE: dict = {}
+_CACHED = {"compiled_cache": _COMPILED_CACHE}
+
+# Rows fetched per round-trip when streaming execution exports, and the size
+# of the chunks handed to the response.
+_EXPORT_BATCH = 500
+_EXPORT_FLUSH_SIZE = 64 * 1024
+# Exports with fewer rows than this are rendered in one piece, not streamed.
+_EXPORT_INLINE_ROWS = 1000
+# Escapes line breaks so multi-line output stays on one CSV line (CRLF -> \n).
+_NL_TABLE = str.maketrans({"\n": "\\n", "\r": ""})
+
+# Headroom on an execution job's RQ timeout for the SSH connect and the
+# semaphore/connection backoff retries in tasks._exec_once.
+_JOB_TIMEOUT_MARGIN_SECONDS = 300
+
+
+def _execution_job_timeout(script: Script, timeout_seconds: int | None, settings) -> int:
+    """RQ hard limit for one execution job: the longest the executor may run, plus a margin."""
+    if timeout_seconds is not None:
+        is_infinite = timeout_seconds == 0
+    else:
+        is_infinite = script.per_server_timeout_seconds == 0
+    if is_infinite:
+        # Infinite runs are only captured for the virtual window
+        run_seconds = getattr(settings, "virtual_timeout_duration", None) or 60
+    else:
+        # The executor enforces the script's own timeout (3600 when unset), so
+        # a shorter override must not cut the job off before it
+        script_timeout = script.per_server_timeout_seconds if (script.per_server_timeout_seconds or 0) > 0 else 3600
+        run_seconds = max(timeout_seconds or 0, script_timeout)
+    return run_seconds + _JOB_TIMEOUT_MARGIN_SECONDS
 
 @router.post("/", response_model=ScriptResponse)
 def create_script(
     script_create: ScriptCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    # Only admins can create scripts
-    if current_user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only admins can create scripts"
-        )
-    
     # Check if script name already exists
-    existing_script = db.query(Script).filter(Script.name == script_create.name).first()
-    if existing_script:
+    name_taken = db.query(db.query(Script.id).filter(Script.name == script_create.name).exists()).scalar()
+    if name_taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Script name already exists"
@@ -96,29 +133,23 @@ def create_script(
     return new_script
 
 @router.post("/marketplace/import", response_model=None)
-def import_marketplace(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    if current_user.role != "admin":
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only admins can import marketplace scripts")
-    created = 0
-    for s in _MARKETPLACE_SEEDS:
-        if db.query(Script).filter(Script.name == s["name"]).first():
-            continue
-        sc = Script(
-            name=s["name"],
-            description=s.get("description"),
-            category=s.get("category"),
-            content=s["content"],
-            script_type=s.get("script_type", "shell"),
-            parameters=s.get("parameters"),
-            created_by=current_user.id,
-        )
-        db.add(sc)
-        created += 1
-    db.commit()
+def import_marketplace(current_user: User = Depends(require_admin), db: Session = Depends(get_db)):
+    # One existence query for every seed name, then a single bulk INSERT for the rest
+    names = [s["name"] for s in _MARKETPLACE_SEEDS]
+    existing = {n for (n,) in db.query(Script.name).filter(Script.name.in_(names))}
+    rows = [
+        dict(s, created_by=current_user.id)
+        for s in _MARKETPLACE_SEEDS
+        if s["name"] not in existing
+    ]
+    if rows:
+        db.bulk_insert_mappings(Script, rows)
+        db.commit()
+    created = len(rows)
     return {"imported": created}
 
 # Extended marketplace seed set
-_MARKETPLACE_SEEDS = [
+_RAW_MARKETPLACE_SEEDS = [
     # Linux System Monitoring
     {
         "name": "disk-usage-linux",
@@ -382,48 +413,96 @@ fi
     },
 ]
 
+# Normalized once at import: immutable tuple of ready-to-insert Script column dicts.
+# scripts.content is Text, so bodies stay str; interning dedupes them across reuse.
+_MARKETPLACE_SEEDS = tuple(
+    {
+        "name": sys.intern(s["name"]),
+        "description": s.get("description"),
+        "category": s.get("category"),
+        "content": sys.intern(s["content"]),
+        "script_type": s.get("script_type", "shell"),
+        "parameters": s.get("parameters"),
+    }
+    for s in _RAW_MARKETPLACE_SEEDS
+)
+
+_APPROX_COUNT_TTL = 30
+
+
+def _approx_count(db: Session, model) -> int:
+    """Approximate row count for an append-mostly table, cached in Redis.
+
+    Postgres uses the planner estimate in pg_class (O(1)); other dialects, or a
+    table that has never been analyzed, fall back to an exact COUNT(*).
+    """
+    table = model.__tablename__
+    key = f"approx_count:{table}"
+    try:
+        cached = get_redis().get(key)
+        if cached is not None:
+            return int(cached)
+    except Exception:
+        cached = None
+    total = -1
+    if db.get_bind().dialect.name == "postgresql":
+        try:
+            total = int(db.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE relname = :t"), {"t": table}
+            ).scalar() or -1)
+        except (ProgrammingError, OperationalError):
+            db.rollback()
+            total = -1
+    if total < 0:
+        # Core-level COUNT(*): no ORM entity setup, no ORDER BY to carry along
+        total = db.execute(select(func.count()).select_from(model.__table__)).scalar() or 0
+    try:
+        get_redis().setex(key, _APPROX_COUNT_TTL, total)
+    except Exception:
+        pass
+    return total
+
+
 @router.get("/", response_model=ScriptListResponse)
 def get_scripts(
     skip: int = Query(0, ge=0),
     limit: int = Query(1000, ge=1, le=10000),
     category: str = Query(None, description="Filter by category"),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    # Only admins can list scripts
-    if current_user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only admins can list scripts"
-        )
-    
-    query = db.query(Script).options(joinedload(Script.creator))
+    # Rows and the filtered total come back together via a COUNT(*) OVER () column
+    query = db.query(Script, func.count().over().label("total")).options(
+        selectinload(Script.creator),
+        raiseload("*"),
+    )
     
     # Apply category filter if provided
     if category:
         query = query.filter(Script.category == category)
     
-    scripts = query.offset(skip).limit(limit).all()
-    total = query.count()
+    rows = query.offset(skip).limit(limit).all()
+    scripts = [row[0] for row in rows]
+    if rows:
+        total = rows[0].total
+    elif skip:
+        # Page past the end: no row carries the window total, fall back to a count
+        total = query.with_entities(func.count(Script.id)).scalar() or 0
+    else:
+        total = 0
     
     return ScriptListResponse(scripts=scripts, total=total)
 
 @router.get("/{script_id}", response_model=ScriptResponse)
 def get_script(
     script_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    # Only admins can view script details
-    if current_user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only admins can view script details"
-        )
-    
-    script = db.query(Script).options(
-        joinedload(Script.creator)
-    ).filter(Script.id == script_id).first()
+    script = db.get(Script, script_id, options=[
+        joinedload(Script.creator),
+        raiseload("*"),
+    ], execution_options=_CACHED)
     
     if script is None:
         raise HTTPException(
@@ -437,17 +516,10 @@ def get_script(
 def update_script(
     script_id: int,
     script_update: ScriptUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    # Only admins can update scripts
-    if current_user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only admins can update scripts"
-        )
-    
-    script = db.query(Script).filter(Script.id == script_id).first()
+    script = db.get(Script, script_id, execution_options=_CACHED)
     if script is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -456,33 +528,23 @@ def update_script(
     
     # Check if name is being changed and if it already exists
     if script_update.name and script_update.name != script.name:
-        existing_script = db.query(Script).filter(Script.name == script_update.name).first()
-        if existing_script:
+        name_taken = db.query(db.query(Script.id).filter(Script.name == script_update.name).exists()).scalar()
+        if name_taken:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Script name already exists"
             )
     
-    # Update fields
-    if script_update.name is not None:
-        script.name = script_update.name
-    if script_update.description is not None:
-        script.description = script_update.description
-    if script_update.content is not None:
-        script.content = script_update.content
-    if script_update.script_type is not None:
-        script.script_type = script_update.script_type
-    if script_update.category is not None:
-        script.category = script_update.category
-    if script_update.parameters is not None:
-        script.parameters = script_update.parameters
-    # Execution settings
-    if script_update.concurrency_limit is not None:
-        script.concurrency_limit = script_update.concurrency_limit
-    if script_update.continue_on_error is not None:
-        script.continue_on_error = 1 if script_update.continue_on_error else 0
-    if script_update.per_server_timeout_seconds is not None:
-        script.per_server_timeout_seconds = script_update.per_server_timeout_seconds
+    # Update only the fields the client sent; explicit nulls clear nullable columns
+    # but are ignored for fields ScriptResponse requires
+    changes = script_update.model_dump(exclude_unset=True)
+    for required in ("name", "content", "script_type", "category"):
+        if changes.get(required, "") is None:
+            del changes[required]
+    if "continue_on_error" in changes and changes["continue_on_error"] is not None:
+        changes["continue_on_error"] = 1 if changes["continue_on_error"] else 0
+    for field, value in changes.items():
+        setattr(script, field, value)
     
     db.commit()
     db.refresh(script)
@@ -491,17 +553,10 @@ def update_script(
 @router.delete("/{script_id}")
 def delete_script(
     script_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    # Only admins can delete scripts
-    if current_user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only admins can delete scripts"
-        )
-    
-    script = db.query(Script).filter(Script.id == script_id).first()
+    script = db.get(Script, script_id, execution_options=_CACHED)
     if script is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -529,29 +584,23 @@ def delete_script(
 @router.post("/executions/{execution_id}/stop")
 def stop_script_execution(
     execution_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     """
     Stop a running script execution
     """
-    # Only admins can stop script executions
-    if current_user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only admins can stop script executions"
-        )
-    
     # Get the execution
-    execution = db.query(ScriptExecution).filter(ScriptExecution.id == execution_id).first()
+    execution = db.get(ScriptExecution, execution_id, execution_options=_CACHED)
     if not execution:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Execution not found"
         )
     
-    # Check if it's still running
-    if execution.status not in ["running", "long_running"]:
+    # Check if it's still queued or running; a queued row is skipped by the
+    # worker once it is cancelled
+    if execution.status not in ["queued", "running", "long_running"]:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Execution is not running (status: {execution.status})"
@@ -567,21 +616,15 @@ def stop_script_execution(
 @router.get("/executions/by-id/{execution_id}")
 def get_script_execution(
     execution_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    # Only admins can view script executions
-    if current_user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only admins can view script executions"
-        )
-
-    ex = db.query(ScriptExecution).options(
+    ex = db.get(ScriptExecution, execution_id, options=[
         joinedload(ScriptExecution.script, innerjoin=False),
         joinedload(ScriptExecution.server, innerjoin=False),
-        joinedload(ScriptExecution.executor, innerjoin=False)
-    ).filter(ScriptExecution.id == execution_id).first()
+        joinedload(ScriptExecution.executor, innerjoin=False),
+        raiseload("*"),
+    ], execution_options=_CACHED)
 
     if not ex:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Execution not found")
@@ -610,18 +653,11 @@ def execute_script(
     script_id: int,
     execution_create: ScriptExecutionCreate,
     timeout_seconds: int | None = Query(None, ge=0, le=3600, description="Override per-server timeout (0 = no timeout, default script or 60)"),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    # Only admins can execute scripts
-    if current_user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only admins can execute scripts"
-        )
-    
     # Verify script exists
-    script = db.query(Script).filter(Script.id == script_id).first()
+    script = db.get(Script, script_id, execution_options=_CACHED)
     if script is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -629,25 +665,17 @@ def execute_script(
         )
     
     # Verify server exists
-    server = db.query(Server).filter(Server.id == execution_create.server_id).first()
+    server = db.get(Server, execution_create.server_id, execution_options=_CACHED)
     if server is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Server not found"
         )
     
-    # Check if this is an infinite script
-    is_infinite = (timeout_seconds == 0) or (timeout_seconds is None and script.per_server_timeout_seconds == 0)
-    
-    # Get virtual timeout duration from settings for infinite scripts
-    from sqlalchemy.exc import OperationalError
-    settings = db.query(Settings).first()
-    if not settings:
-        settings = Settings()
-        db.add(settings)
-        db.commit()
-        db.refresh(settings)
-    virtual_timeout_duration = settings.virtual_timeout_duration or 60
+    # Settings drive the long_running delay and the job timeout; the worker reads
+    # its own copy for execution
+    settings = get_settings_cached(db)
+    job_timeout = _execution_job_timeout(script, timeout_seconds, settings)
     
     # Create execution record
     execution = ScriptExecution(
@@ -655,202 +683,219 @@ def execute_script(
         server_id=execution_create.server_id,
         executed_by=current_user.id,
         parameters_used=execution_create.parameters_used,
-        status="running"
+        status="queued"
     )
-    try:
-        execution.id = None
-    except Exception:
-        pass
     
     db.add(execution)
     db.commit()
     db.refresh(execution)
     
-    # Start background task to mark as long_running after a configurable delay
-    import threading
+    # Mark as long_running after a configurable delay via a delayed RQ job
+    # (requires workers started with --with-scheduler)
     # Read configurable delay from settings if available; default to 300s
     try:
         long_running_delay_seconds = getattr(settings, 'long_running_delay_seconds', 300) or 300
     except Exception:
         long_running_delay_seconds = 300
-
-    def mark_long_running(execution_id: int):
-        time.sleep(long_running_delay_seconds)
-        try:
-            # Check if still running
-            from database import SessionLocal
-            db_session = SessionLocal()
-            exec_check = db_session.query(ScriptExecution).filter(ScriptExecution.id == execution_id).first()
-            if exec_check and exec_check.status == "running":
-                exec_check.status = "long_running"
-                db_session.commit()
-                print(f"Marked execution {execution_id} as long_running after {long_running_delay_seconds}s")
-        except Exception as e:
-            print(f"Error marking execution as long_running: {e}")
-        finally:
-            if 'db_session' in locals():
-                db_session.close()
-    
-    long_running_thread = threading.Thread(target=mark_long_running, args=(execution.id,), daemon=True)
-    long_running_thread.start()
-    
-    # Execute over SSH using the robust SSH connection manager
     try:
-        from ssh_script_executor import execute_script_on_server
-        from ssh_manager import SSHConnectionError
-        
-        # Log successful authentication attempt
-        auth_logger.log_script_execution_auth(
-            script_name=script.name,
-            server_name=server.name,
-            server_ip=server.ip,
-            auth_method_used="ssh_manager",
-            success=True,
-            details={"user_id": current_user.id}
+        get_queue().enqueue_in(
+            timedelta(seconds=long_running_delay_seconds),
+            mark_long_running_task,
+            execution.id,
+            job_id=f"lr-{execution.id}",
         )
-        
-        # Execute the script
-        out, err, exit_code = execute_script_on_server(
-            script=script,
-            server=server,
-            execution=execution,
-            is_infinite=is_infinite,
-            virtual_timeout_duration=virtual_timeout_duration
-        )
-        
-        # Handle script execution results
-        if is_infinite:
-            # For infinite scripts, keep status as "running" and don't set completed_at
-            execution.status = "running"
-            execution.output = out
-            execution.error = None  # No error for infinite scripts
-            # Don't set completed_at - let it stay None
-        else:
-            # Regular script
-            execution.status = "completed" if exit_code == 0 else "failed"
-            execution.output = out
-            execution.error = err if exit_code != 0 else None
-            execution.completed_at = func.now()
-
-        db.commit()
-        db.refresh(execution)
-        return execution
-        
-    except SSHConnectionError as e:
-        print(f"SSH connection failed for {server.name}: {e}")
-        
-        # Log failed authentication
-        auth_logger.log_script_execution_auth(
-            script_name=script.name,
-            server_name=server.name,
-            server_ip=server.ip,
-            auth_method_used="ssh_manager",
-            success=False,
-            details={"error": str(e), "user_id": current_user.id}
+    except Exception as e:
+        logger.error(f"long_running enqueue failed {kv(execution_id=execution.id, error=str(e))}")
+    
+    # Hand the SSH run to an RQ worker; the job updates this row in place
+    try:
+        get_queue("execute").enqueue(
+            execute_script_job,
+            script_id,
+            server.id,
+            current_user.id,
+            execution_id=execution.id,
+            timeout_seconds=timeout_seconds,
+            job_timeout=job_timeout,
         )
-        
+    except Exception as e:
+        logger.error(f"execute enqueue failed {kv(execution_id=execution.id, error=str(e))}")
         execution.status = "failed"
-        execution.error = f"SSH connection failed: {e}"
-        execution.completed_at = func.now()
+        execution.error = f"Failed to enqueue execution: {e}"
+        execution.completed_at = datetime.now(timezone.utc)
         db.commit()
         db.refresh(execution)
-        return execution
+    return execution
+
+# List endpoints ship only a preview of output/error; full text is streamed from
+# GET /executions/{id}/output. One extra char is fetched to detect truncation.
+_PREVIEW_CHARS = 4096
+_OUTPUT_CHUNK_CHARS = 65536
+
+
+def _summary_columns():
+    return (
+        ScriptExecution.id,
+        ScriptExecution.script_id,
+        ScriptExecution.server_id,
+        ScriptExecution.executed_by,
+        ScriptExecution.status,
+        func.substr(ScriptExecution.output, 1, _PREVIEW_CHARS + 1).label("output"),
+        func.substr(ScriptExecution.error, 1, _PREVIEW_CHARS + 1).label("error"),
+        ScriptExecution.started_at,
+        ScriptExecution.completed_at,
+        ScriptExecution.parameters_used,
+    )
+
+
+def _preview(value: str | None) -> tuple[str | None, bool]:
+    if value is not None and len(value) > _PREVIEW_CHARS:
+        return value[:_PREVIEW_CHARS], True
+    return value, False
+
+
+def _utc(dt: datetime | None) -> datetime | None:
+    # Same normalization as ScriptExecutionResponse._ensure_timezone
+    if dt is not None and dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+@dataclass(slots=True)
+class _ExecView:
+    """Row shape of GET /executions/ (mirrors ScriptExecutionListResponse items)."""
+    id: int
+    script_id: int | None
+    server_id: int
+    executed_by: int | None
+    status: str
+    output: str | None
+    error: str | None
+    output_truncated: bool
+    error_truncated: bool
+    started_at: datetime | None
+    completed_at: datetime | None
+    parameters_used: str | None
+    script: dict | None = None
+    server: dict | None = None
+    server_groups: list | None = None
+    executor: dict | None = None
+
 
-@router.get("/executions/", response_model=ScriptExecutionListResponse)
+@router.get("/executions/")
 def get_script_executions(
     skip: int = Query(0, ge=0),
     limit: int = Query(1000, ge=1, le=10000),
-    current_user: User = Depends(get_current_user),
+    before_id: int | None = Query(None, ge=1, description="Keyset cursor: return executions with id < before_id (ignores skip)"),
+    current_user: User = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    # Only admins can view script executions
-    if current_user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only admins can view script executions"
-        )
+    # Summary columns plus joined names only; output/error are capped previews
+    query = db.query(
+        *_summary_columns(),
+        Script.name.label("script_name"),
+        Server.name.label("server_name"),
+        User.username.label("executor_username"),
+    ).outerjoin(Script, ScriptExecution.script_id == Script.id).outerjoin(
+        Server, ScriptExecution.server_id == Server.id
+    ).outerjoin(User, ScriptExecution.executed_by == User.id)
+    if before_id is not None:
+        # Keyset pagination: index range scan instead of skipping `skip` rows
+        query = query.filter(ScriptExecution.id < before_id).order_by(ScriptExecution.id.desc())
+    else:
+        query = query.order_by(ScriptExecution.id.desc()).offset(skip)
+    executions = query.limit(limit).all()
     
-    executions = db.query(ScriptExecution).options(
-        joinedload(ScriptExecution.script, innerjoin=False),
-        joinedload(ScriptExecution.server, innerjoin=False),
-        joinedload(ScriptExecution.executor, innerjoin=False)
-    ).order_by(ScriptExecution.id.desc()).offset(skip).limit(limit).all()
+    # Unfiltered, append-mostly table: the paginator only needs an approximate total
+    total = _approx_count(db, ScriptExecution)
     
-    total = db.query(ScriptExecution).count()
+    # Server groups for the whole page in one query instead of two per execution
+    groups_by_server = defaultdict(list)
+    server_ids = {ex.server_id for ex in executions if ex.server_id}
+    if server_ids:
+        try:
+            group_rows = db.query(
+                ServerGroupAssociation.server_id, ServerGroup.id, ServerGroup.name
+            ).join(
+                ServerGroup, ServerGroup.id == ServerGroupAssociation.group_id
+            ).filter(ServerGroupAssociation.server_id.in_(server_ids)).all()
+            for server_id, gid, gname in group_rows:
+                groups_by_server[server_id].append({"id": gid, "name": gname})
+        except Exception:
+            groups_by_server.clear()
     
-    # Serialize manually to include server/script names and server groups
+    # Serialize straight to JSON bytes; skips ScriptExecutionListResponse validation on this hot path
     items = []
     for ex in executions:
-        item = {
-            "id": ex.id,
-            "script_id": ex.script_id,
-            "server_id": ex.server_id,
-            "executed_by": ex.executed_by,
-            "status": ex.status,
-            "output": ex.output,
-            "error": ex.error,
-            "started_at": ex.started_at,
-            "completed_at": ex.completed_at,
-            "parameters_used": ex.parameters_used,
-        }
-        if getattr(ex, "script", None):
-            item["script"] = {"id": ex.script.id, "name": ex.script.name}
-        if getattr(ex, "server", None):
-            item["server"] = {"id": ex.server.id, "name": ex.server.name, "timezone": getattr(ex.server, 'timezone', 'UTC')}
-            # Get server groups separately to avoid complex joins
-            try:
-                from models import ServerGroupAssociation
-                group_assocs = db.query(ServerGroupAssociation).filter(ServerGroupAssociation.server_id == ex.server.id).all()
-                group_ids = [ga.group_id for ga in group_assocs]
-                if group_ids:
-                    from models import ServerGroup
-                    groups = db.query(ServerGroup).filter(ServerGroup.id.in_(group_ids)).all()
-                    item["server_groups"] = [{"id": g.id, "name": g.name} for g in groups]
-                else:
-                    item["server_groups"] = []
-            except Exception:
-                item["server_groups"] = []
-        if getattr(ex, "executor", None):
-            item["executor"] = {"id": ex.executor.id, "username": ex.executor.username}
-        items.append(item)
-    
-    return {"executions": items, "total": total}
+        output, output_truncated = _preview(ex.output)
+        error, error_truncated = _preview(ex.error)
+        has_server = ex.server_name is not None
+        items.append(_ExecView(
+            id=ex.id,
+            script_id=ex.script_id,
+            server_id=ex.server_id,
+            executed_by=ex.executed_by,
+            status=ex.status,
+            output=output,
+            error=error,
+            output_truncated=output_truncated,
+            error_truncated=error_truncated,
+            started_at=_utc(ex.started_at),
+            completed_at=_utc(ex.completed_at),
+            parameters_used=ex.parameters_used,
+            script={"id": ex.script_id, "name": ex.script_name} if ex.script_name is not None else None,
+            server={"id": ex.server_id, "name": ex.server_name, "timezone": "UTC"} if has_server else None,
+            server_groups=groups_by_server.get(ex.server_id, []) if has_server else None,
+            executor={"id": ex.executed_by, "username": ex.executor_username} if ex.executor_username is not None else None,
+        ))
+    return Response(
+        content=orjson.dumps({"executions": items, "total": total}, default=str),
+        media_type="application/json",
+    )
 
 
 @router.get("/executions/latest", response_model=ScriptExecutionListResponse)
 def get_latest_script_executions(
     limit: int = Query(1000, ge=1, le=10000),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    # Only admins can view script executions
-    if current_user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only admins can view script executions"
-        )
-
-    executions = db.query(ScriptExecution).order_by(ScriptExecution.id.desc()).limit(limit).all()
+    executions = db.query(*_summary_columns()).order_by(ScriptExecution.id.desc()).limit(limit).all()
 
     items = []
     for ex in executions:
-        item = {
-            "id": ex.id,
-            "script_id": ex.script_id,
-            "server_id": ex.server_id,
-            "executed_by": ex.executed_by,
-            "status": ex.status,
-            "output": ex.output,
-            "error": ex.error,
-            "started_at": ex.started_at,
-            "completed_at": ex.completed_at,
-            "parameters_used": ex.parameters_used,
-        }
+        item = dict(ex._mapping)
+        item["output"], item["output_truncated"] = _preview(ex.output)
+        item["error"], item["error_truncated"] = _preview(ex.error)
         items.append(item)
 
-    total = db.query(ScriptExecution).count()
+    total = _approx_count(db, ScriptExecution)
     return {"executions": items, "total": total}
 
+
+@router.get("/executions/{execution_id}/output")
+def stream_execution_output(
+    execution_id: int,
+    stream: str = Query("output", pattern="^(output|error)$", description="Which text to stream"),
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Stream the full stdout/stderr of one execution in fixed-size chunks."""
+    column = ScriptExecution.output if stream == "output" else ScriptExecution.error
+    # One read of the column: substr() per chunk would make Postgres detoast the
+    # whole value again for every slice
+    row = db.query(column).filter(ScriptExecution.id == execution_id).first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Execution not found")
+    body = row[0] or ""
+
+    def generate_chunks():
+        for start in range(0, len(body), _OUTPUT_CHUNK_CHARS):
+            yield body[start:start + _OUTPUT_CHUNK_CHARS]
+
+    return StreamingResponse(generate_chunks(), media_type="text/plain; charset=utf-8")
+
+
 @router.get("/executions/export")
 def export_script_executions(
     format: str = Query("csv", pattern="^(csv|json)$"),
@@ -860,18 +905,10 @@ def export_script_executions(
     group_ids: str | None = Query(None, description="comma-separated group ids"),
     from_date: str | None = Query(None, description="YYYY-MM-DD"),
     to_date: str | None = Query(None, description="YYYY-MM-DD"),
-    current_user: User = Depends(get_current_user),
+    include_output: bool = Query(True, description="Include output/error bodies (false exports metadata only)"),
+    current_user: User = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    if current_user.role != "admin":
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only admins can export")
-
-    executions = db.query(ScriptExecution).options(
-        joinedload(ScriptExecution.script),
-        joinedload(ScriptExecution.server).joinedload(Server.groups),
-        joinedload(ScriptExecution.executor)
-    ).all()
-
     def parse_ids(s: str | None):
         if not s:
             return set()
@@ -884,90 +921,127 @@ def export_script_executions(
     server_id_set = parse_ids(server_ids)
     group_id_set = parse_ids(group_ids)
 
-    # Apply filters
-    items = []
-    for ex in executions:
-        if status_filter and ex.status != status_filter:
-            continue
-        if script_id_set and ex.script_id not in script_id_set:
-            continue
-        if server_id_set and ex.server_id not in server_id_set:
-            continue
-        if group_id_set:
-            s_groups = getattr(getattr(ex, "server", None), "groups", []) or []
-            s_group_ids = {g.id for g in s_groups}
-            if not (s_group_ids & group_id_set):
-                continue
-        if from_date:
-            try:
-                y, m, d = [int(x) for x in from_date.split("-")]
-                if not ex.started_at or ex.started_at < func.datetime(f"{y:04d}-{m:02d}-{d:02d} 00:00:00"):
-                    # fallback: do client-side compare when materialized
-                    pass
-            except Exception:
-                pass
-        if to_date:
-            try:
-                y, m, d = [int(x) for x in to_date.split("-")]
-            except Exception:
-                pass
-
-        item = {
-            "id": ex.id,
-            "script_id": ex.script_id,
-            "script_name": (ex.script.name if getattr(ex, "script", None) else None),
-            "server_id": ex.server_id,
-            "server_name": (ex.server.name if getattr(ex, "server", None) else None),
-            "status": ex.status,
-            "output": ex.output,
-            "error": ex.error,
-            "started_at": ex.started_at.isoformat() if ex.started_at else None,
-            "completed_at": ex.completed_at.isoformat() if ex.completed_at else None,
-            "executor": (ex.executor.username if getattr(ex, "executor", None) else None),
-        }
-        items.append(item)
+    def parse_day(s: str | None):
+        if not s:
+            return None
+        try:
+            return date.fromisoformat(s)
+        except ValueError:
+            return None
 
-    # Date range filtering in python (sa func not evaluated client-side)
-    from_dt = None
-    to_dt = None
-    try:
-        if from_date:
-            from_dt = time.strptime(from_date, "%Y-%m-%d")
-        if to_date:
-            to_dt = time.strptime(to_date, "%Y-%m-%d")
-    except Exception:
-        pass
+    from_dt = parse_day(from_date)
+    to_dt = parse_day(to_date)
 
-    def in_range(iso: str | None):
-        if not iso:
-            return False
-        try:
-            dt = time.strptime(iso[:10], "%Y-%m-%d")
-            if from_dt and dt < from_dt:
-                return False
-            if to_dt and dt > to_dt:
-                return False
-            return True
-        except Exception:
-            return True
+    # Group filtering happens in SQL, so Server.groups is never touched here;
+    # only the scalar many-to-ones are joined and anything else raises.
+    # The joined rows only contribute a name each; don't drag Script.content or
+    # the server's credentials along with every execution.
+    stmt = select(ScriptExecution).options(
+        joinedload(ScriptExecution.script).load_only(Script.name),
+        joinedload(ScriptExecution.server).load_only(Server.name),
+        joinedload(ScriptExecution.executor).load_only(User.username),
+        raiseload("*")
+    )
+    if not include_output:
+        stmt = stmt.options(load_only(
+            ScriptExecution.id, ScriptExecution.script_id, ScriptExecution.server_id,
+            ScriptExecution.executed_by, ScriptExecution.status,
+            ScriptExecution.started_at, ScriptExecution.completed_at,
+        ))
+    if status_filter:
+        stmt = stmt.where(ScriptExecution.status == status_filter)
+    if script_id_set:
+        stmt = stmt.where(ScriptExecution.script_id.in_(script_id_set))
+    if server_id_set:
+        stmt = stmt.where(ScriptExecution.server_id.in_(server_id_set))
+    if group_id_set:
+        # Semi-join on the association table so a server in several of the
+        # requested groups doesn't duplicate its executions.
+        stmt = stmt.where(ScriptExecution.server_id.in_(
+            select(ServerGroupAssociation.server_id)
+            .where(ServerGroupAssociation.group_id.in_(group_id_set))
+        ))
+    if from_dt:
+        stmt = stmt.where(ScriptExecution.started_at >= from_dt)
+    if to_dt:
+        # to_date is inclusive of the whole day
+        stmt = stmt.where(ScriptExecution.started_at < to_dt + timedelta(days=1))
 
-    if from_dt or to_dt:
-        items = [it for it in items if in_range(it.get("started_at"))]
+    headers = ["id","script_id","script_name","server_id","server_name","status","started_at","completed_at","executor"]
+    if include_output:
+        headers += ["output", "error"]
+
+    def iter_rows():
+        # Tuples in `headers` order, built straight off the ORM row
+        # yield_per as an execution option also turns on stream_results, so
+        # the driver uses a server-side cursor instead of buffering the whole
+        # result before the first batch comes back.
+        for ex in db.execute(stmt.execution_options(yield_per=_EXPORT_BATCH)).scalars():
+            # Relationships are eagerly joined; None only means no related row
+            script, server, executor = ex.script, ex.server, ex.executor
+            row = (
+                ex.id,
+                ex.script_id,
+                script.name if script is not None else None,
+                ex.server_id,
+                server.name if server is not None else None,
+                ex.status,
+                ex.started_at.isoformat() if ex.started_at else None,
+                ex.completed_at.isoformat() if ex.completed_at else None,
+                executor.username if executor is not None else None,
+            )
+            if include_output:
+                row += (ex.output, ex.error)
+            yield row
+
+    # One JSON array, encoded element by element with orjson and flushed in
+    # the same ~64 KiB chunks as the CSV path
+    def gen_json(rows):
+        buf = bytearray(b"[")
+        sep = b""
+        for row in rows:
+            buf += sep
+            buf += orjson.dumps(dict(zip(headers, row)))
+            sep = b","
+            if len(buf) >= _EXPORT_FLUSH_SIZE:
+                yield bytes(buf)
+                buf.clear()
+        buf += b"]"
+        yield bytes(buf)
+
+    # CSV, written so neither the result set nor the rendered file is ever held
+    # in memory as a whole. Rows accumulate in a ~64 KiB buffer so the response
+    # goes out in a few large chunks rather than one per row.
+    def gen_csv(rows):
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(headers)
+        for row in rows:
+            if buf.tell() >= _EXPORT_FLUSH_SIZE:
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate(0)
+            # Avoid newlines breaking csv cells; ids go to csv as-is
+            writer.writerow([
+                v.translate(_NL_TABLE) if isinstance(v, str) else ("" if v is None else v)
+                for v in row
+            ])
+        yield buf.getvalue()
 
     if format == "json":
-        return JSONResponse(items)
+        render, media_type, extra_headers = gen_json, "application/json", None
+    else:
+        render, media_type = gen_csv, "text/csv"
+        extra_headers = {"Content-Disposition": "attachment; filename=executions.csv"}
 
-    # CSV export
-    headers = ["id","script_id","script_name","server_id","server_name","status","started_at","completed_at","executor","output","error"]
-    buf = io.StringIO()
-    writer = csv.DictWriter(buf, fieldnames=headers)
-    writer.writeheader()
-    for it in items:
-        # Avoid newlines breaking csv cells
-        row = {k: (str(it.get(k)).replace("\n","\\n") if it.get(k) is not None else "") for k in headers}
-        writer.writerow(row)
-    buf.seek(0)
-    return StreamingResponse(buf, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=executions.csv"})
+    # Most exports are small: if the whole result fits in the first slice,
+    # answer with a plain body and skip chunked streaming altogether.
+    rows = iter_rows()
+    head = list(islice(rows, _EXPORT_INLINE_ROWS))
+    if len(head) < _EXPORT_INLINE_ROWS:
+        body = b"".join(render(head)) if format == "json" else "".join(render(head))
+        return Response(body, media_type=media_type, headers=extra_headers)
+    return StreamingResponse(render(chain(head, rows)), media_type=media_type, headers=extra_headers)
 
 
 @router.post("/{script_id}/execute-group")
@@ -978,13 +1052,10 @@ def execute_script_group(
     continue_on_error: bool | None = Query(None, description="Override continue-on-error (default script or true)"),
     timeout_seconds: int | None = Query(None, ge=0, le=3600, description="Override per-server timeout (0 = no timeout, default script or 60)"),
     parameters_used: str | None = None,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    if current_user.role != "admin":
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only admins can execute scripts")
-
-    script = db.query(Script).filter(Script.id == script_id).first()
+    script = db.get(Script, script_id, execution_options=_CACHED)
     if not script:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Script not found")
 
@@ -1001,9 +1072,15 @@ def execute_script_group(
     from tasks import execute_script_job
 
     q = get_queue("execute")
+    job_timeout = _execution_job_timeout(script, None, get_settings_cached(db))
+    job_datas = [
+        Queue.prepare_data(execute_script_job, args=(script.id, srv.id, current_user.id, None), timeout=job_timeout)
+        for srv in servers
+    ]
+    # enqueue_many writes every job through one pipeline
+    jobs = q.enqueue_many(job_datas)
     results = []
-    for srv in servers:
-        job = q.enqueue(execute_script_job, script.id, srv.id, current_user.id, None)
+    for srv, job in zip(servers, jobs):
         results.append({
             "server_id": srv.id,
             "server_name": srv.name,
@@ -1013,18 +1090,123 @@ def execute_script_group(
 
     return {"summary": {"total": len(servers), "enqueued": len(results)}, "results": results}
 
+_BATCH_TTL_SECONDS = 86400
+
+
+def _batch_key(batch_id: str) -> str:
+    return f"exec:batch:{batch_id}"
+
+
+@router.post("/{script_id}/execute-batch")
+def execute_script_batch(
+    script_id: int,
+    payload: ScriptBatchExecute,
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Queue one execution per server in a single Redis round-trip; poll the returned batch_id."""
+    script = db.get(Script, script_id, execution_options=_CACHED)
+    if not script:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Script not found")
+
+    requested = list(dict.fromkeys(payload.server_ids))
+    found = {sid for (sid,) in db.query(Server.id).filter(Server.id.in_(requested))}
+    server_ids = [sid for sid in requested if sid in found]
+    if not server_ids:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No matching servers")
+
+    timeout_seconds = payload.timeout_seconds
+    job_timeout = _execution_job_timeout(script, timeout_seconds, get_settings_cached(db))
+
+    # Pre-create queued rows so the batch can be rolled up by execution id
+    executions = [
+        ScriptExecution(
+            script_id=script_id,
+            server_id=sid,
+            executed_by=current_user.id,
+            parameters_used=payload.parameters_used,
+            status="queued",
+        )
+        for sid in server_ids
+    ]
+    db.add_all(executions)
+    db.flush()
+    exec_ids = [ex.id for ex in executions]
+    db.commit()
+
+    batch_id = uuid.uuid4().hex
+    q = get_queue("execute")
+    job_datas = [
+        Queue.prepare_data(
+            execute_script_job,
+            args=(script_id, sid, current_user.id),
+            kwargs={"execution_id": eid, "timeout_seconds": timeout_seconds},
+            timeout=job_timeout,
+            job_id=f"exec-{eid}",
+        )
+        for sid, eid in zip(server_ids, exec_ids)
+    ]
+    try:
+        # enqueue_many writes every job through one pipeline
+        q.enqueue_many(job_datas)
+        with q.connection.pipeline(transaction=False) as pipe:
+            pipe.rpush(_batch_key(batch_id), *exec_ids)
+            pipe.expire(_batch_key(batch_id), _BATCH_TTL_SECONDS)
+            pipe.execute()
+    except Exception as e:
+        logger.error(f"batch enqueue failed {kv(script_id=script_id, error=str(e))}")
+        db.query(ScriptExecution).filter(ScriptExecution.id.in_(exec_ids)).update(
+            {"status": "failed", "error": f"Failed to enqueue execution: {e}", "completed_at": datetime.now(timezone.utc)},
+            synchronize_session=False,
+        )
+        db.commit()
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Failed to enqueue batch")
+
+    logger.info(f"batch enqueued {kv(batch_id=batch_id, script_id=script_id, count=len(exec_ids))}")
+    return {
+        "batch_id": batch_id,
+        "summary": {"requested": len(requested), "enqueued": len(exec_ids), "skipped": len(requested) - len(exec_ids)},
+        "results": [{"server_id": sid, "execution_id": eid, "job_id": f"exec-{eid}"} for sid, eid in zip(server_ids, exec_ids)],
+    }
+
+
+@router.get("/executions/batch/{batch_id}")
+def get_execution_batch(
+    batch_id: str,
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Status rollup for a batch created by execute-batch."""
+    try:
+        exec_ids = [int(x) for x in get_redis().lrange(_batch_key(batch_id), 0, -1)]
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Batch store unavailable")
+    if not exec_ids:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Batch not found or expired")
+    counts = dict(
+        db.query(ScriptExecution.status, func.count(ScriptExecution.id))
+        .filter(ScriptExecution.id.in_(exec_ids))
+        .group_by(ScriptExecution.status)
+        .all()
+    )
+    return {"batch_id": batch_id, "total": len(exec_ids), "status_counts": counts, "execution_ids": exec_ids}
+
+
 @router.post("/execute/enqueue/{script_id}/{server_id}")
 def enqueue_execute_script(script_id: int, server_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     logger = get_logger(__name__)
     # Basic existence checks
-    script = db.query(Script).filter(Script.id == script_id).first()
-    server = db.query(Server).filter(Server.id == server_id).first()
+    script = db.get(Script, script_id, execution_options=_CACHED)
+    server = db.get(Server, server_id, execution_options=_CACHED)
     if not script or not server:
         raise HTTPException(status_code=404, detail="Script or Server not found")
 
     # Enqueue job
     q = get_queue("execute")
-    job = q.enqueue(execute_script_job, script_id, server_id, current_user.id if current_user else None, None)
+    job = q.enqueue(
+        execute_script_job, script_id, server_id, current_user.id if current_user else None, None,
+        job_timeout=_execution_job_timeout(script, None, get_settings_cached(db)),
+    )
     logger.info(f"enqueued {kv(job_id=job.id, script_id=script_id, server_id=server_id)}")
     return {"enqueued": True, "job_id": job.id}
 
@@ -1087,4 +1269,5 @@ def update_settings(payload: dict, db: Session = Depends(get_db)):
             pass
     db.commit()
     db.refresh(s)
+    invalidate_settings_cache()
     return s
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload, selectinload
 from typing import List
 from database import get_db
 from models import ServerGroup, User
 from schemas import ServerGroupResponse, ServerGroupCreate, ServerGroupUpdate, ServerGroupListResponse
-from auth import get_current_user
+from auth import require_admin
 from audit_utils import log_audit
 
 router = APIRouter()
@@ -12,16 +13,9 @@ router = APIRouter()
 @router.post("/", response_model=ServerGroupResponse)
 def create_server_group(
     group_create: ServerGroupCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    # Only admins can create server groups
-    if current_user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only admins can create server groups"
-        )
-    
     # Check if group name already exists
     existing_group = db.query(ServerGroup).filter(ServerGroup.name == group_create.name).first()
     if existing_group:
@@ -49,36 +43,31 @@ def create_server_group(
 def get_server_groups(
     skip: int = Query(0, ge=0),
     limit: int = Query(1000, ge=1, le=10000),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    # Only admins can list server groups
-    if current_user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only admins can list server groups"
-        )
-    
-    groups = db.query(ServerGroup).options(
-        joinedload(ServerGroup.servers)
+    # selectinload keeps LIMIT counting groups rather than group x server rows;
+    # the total rides along as a COUNT(*) OVER () column.
+    rows = db.query(ServerGroup, func.count().over().label("total")).options(
+        selectinload(ServerGroup.servers)
     ).offset(skip).limit(limit).all()
-    total = db.query(ServerGroup).count()
+    groups = [row[0] for row in rows]
+    if rows:
+        total = rows[0].total
+    elif skip:
+        # Page past the end: no row carries the window total, fall back to a count
+        total = db.query(func.count(ServerGroup.id)).scalar() or 0
+    else:
+        total = 0
     
     return ServerGroupListResponse(groups=groups, total=total)
 
 @router.get("/{group_id}", response_model=ServerGroupResponse)
 def get_server_group(
     group_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    # Only admins can view server group details
-    if current_user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only admins can view server group details"
-        )
-    
     group = db.query(ServerGroup).options(
         joinedload(ServerGroup.servers)
     ).filter(ServerGroup.id == group_id).first()
@@ -93,16 +82,9 @@ def get_server_group(
 def update_server_group(
     group_id: int,
     group_update: ServerGroupUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    # Only admins can update server groups
-    if current_user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only admins can update server groups"
-        )
-    
     group = db.query(ServerGroup).filter(ServerGroup.id == group_id).first()
     if group is None:
         raise HTTPException(
@@ -137,16 +119,9 @@ def update_server_group(
 @router.delete("/{group_id}")
 def delete_server_group(
     group_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    # Only admins can delete server groups
-    if current_user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only admins can delete server groups"
-        )
-    
     group = db.query(ServerGroup).filter(ServerGroup.id == group_id).first()
     if group is None:
         raise HTTPException(
@@ -154,10 +129,14 @@ def delete_server_group(
             detail="Server group not found"
         )
     
-    # Check if group has servers
+    # Check if group has servers; EXISTS stops at the first association and
+    # the exact count is only taken for the error message.
     from models import ServerGroupAssociation
-    servers_in_group = db.query(ServerGroupAssociation).filter(ServerGroupAssociation.group_id == group_id).count()
-    if servers_in_group > 0:
+    in_use = db.query(
+        db.query(ServerGroupAssociation.id).filter(ServerGroupAssociation.group_id == group_id).exists()
+    ).scalar()
+    if in_use:
+        servers_in_group = db.query(func.count(ServerGroupAssociation.id)).filter(ServerGroupAssociation.group_id == group_id).scalar()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Cannot delete group '{group.name}' - it contains {servers_in_group} server(s). Remove or reassign servers first."
@@ -1,29 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query
+from sqlalchemy import delete, func
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
+import asyncio
 import os
-import subprocess
 import paramiko
+import string
 import base64
+import time
 from pathlib import Path
-from database import get_db
-from models import Server, User, ServerGroup
+from database import get_db, SessionLocal
+from models import Server, User, ServerGroup, ServerGroupAssociation, ServerHealth, ScriptExecution
 from schemas import ServerResponse, ServerCreate, ServerUpdate, ServerListResponse
-from auth import get_current_user, get_password_hash
+from auth import get_current_user, get_password_hashes
 from secrets_vault import SecretsVault
 from audit_logger import AuditLogger, AuditActions
 from audit_utils import log_audit
 from auth_logger import auth_logger
-from ssh_key_utils import get_ssh_key_type, get_ssh_key_parameters, get_paramiko_key_class, detect_key_type_from_file
-from os_detection import detect_os_automatically
+from ssh_key_utils import get_ssh_key_type, get_ssh_key_parameters, get_paramiko_key_class, detect_key_type_from_file, ssh_key_index, find_ssh_key, create_ssh_key_files, remove_ssh_key_files
+from os_detection import detect_os_automatically, classify_uname
+from utils_logging import get_logger
 
 router = APIRouter()
+logger = get_logger(__name__)
+
+# Deletes the characters allowed in key names, so valid names translate to ""
+_KEY_NAME_ALLOWED = str.maketrans("", "", string.ascii_letters + string.digits + "-_")
 
 @router.post("/generate-ssh-key")
-def generate_ssh_key(
+async def generate_ssh_key(
     key_name: str = Query(..., description="Name for the SSH key pair"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
     # Only admins can generate SSH keys
     if current_user.role != "admin":
@@ -39,20 +46,23 @@ def generate_ssh_key(
             detail="Key name is required"
         )
     
-    # Sanitize key name (only allow alphanumeric, hyphens, and underscores)
-    sanitized_key_name = "".join(c for c in key_name if c.isalnum() or c in "-_")
-    if sanitized_key_name != key_name:
+    # Sanitize key name (only allow alphanumeric, hyphens, and underscores):
+    # stripping every allowed character must leave nothing behind
+    if key_name.translate(_KEY_NAME_ALLOWED):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Key name can only contain letters, numbers, hyphens, and underscores"
         )
     
+    sanitized_key_name = key_name
+    
     # Create SSH keys directory if it doesn't exist
     ssh_keys_dir = Path("ssh_keys")
     ssh_keys_dir.mkdir(exist_ok=True)
     
-    # Get configured SSH key type
-    key_type = get_ssh_key_type()
+    # Get configured SSH key type; a settings cache miss queries the database,
+    # so do it off the event loop
+    key_type = await asyncio.to_thread(get_ssh_key_type)
     key_params = get_ssh_key_parameters(key_type)
     
     # Generate unique key filename based on key type
@@ -67,36 +77,15 @@ def generate_ssh_key(
         )
     
     try:
-        # Generate SSH key pair using ssh-keygen with configurable parameters
-        cmd = [
-            "ssh-keygen",
-            "-t", key_params["type"],
-            "-f", str(private_key_path),
-            "-N", "",  # No passphrase by default
-            "-C", f"{key_params['comment_prefix']}-{sanitized_key_name}"
-        ]
-        
-        # Add bits parameter for RSA and ECDSA
-        if key_params["bits"]:
-            cmd.extend(["-b", key_params["bits"]])
-        
-        # Add PEM format for RSA (Ed25519 and ECDSA use OpenSSH format by default)
-        if key_params["type"] == "rsa":
-            cmd.append("-m")
-            cmd.append("PEM")
-        
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-        
-        # Read the generated keys
-        with open(private_key_path, 'r') as f:
-            private_key = f.read()
-        
-        with open(public_key_path, 'r') as f:
-            public_key = f.read()
-        
-        # Set proper permissions for private key (600)
-        os.chmod(private_key_path, 0o600)
-        os.chmod(public_key_path, 0o644)
+        # Generate the key pair in-process (no ssh-keygen fork); RSA-4096 is
+        # CPU-heavy, so keep it off the event loop
+        private_key, public_key = await asyncio.to_thread(
+            create_ssh_key_files,
+            private_key_path,
+            public_key_path,
+            key_params,
+            f"{key_params['comment_prefix']}-{sanitized_key_name}",
+        )
         
         return {
             "message": "SSH key pair generated successfully",
@@ -106,20 +95,11 @@ def generate_ssh_key(
             "private_key": private_key
         }
         
-    except subprocess.CalledProcessError as e:
-        # Clean up any partially created files
-        if private_key_path.exists():
-            private_key_path.unlink()
-        if public_key_path.exists():
-            public_key_path.unlink()
-        
-        error_detail = f"Failed to generate SSH key: {e.stderr}"
-        if "Permission denied" in e.stderr:
-            error_detail += " (Check if the application has write permissions to the ssh_keys directory)"
-        
+    except FileExistsError:
+        # Lost a race with a concurrent request for the same name
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=error_detail
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"SSH key with name '{sanitized_key_name}' already exists"
         )
     except Exception as e:
         # Clean up any partially created files
@@ -128,9 +108,13 @@ def generate_ssh_key(
         if public_key_path.exists():
             public_key_path.unlink()
         
+        error_detail = f"Error generating SSH key: {str(e)}"
+        if isinstance(e, PermissionError):
+            error_detail += " (Check if the application has write permissions to the ssh_keys directory)"
+        
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error generating SSH key: {str(e)}"
+            detail=error_detail
         )
 
 @router.get("/ssh-keys")
@@ -145,52 +129,42 @@ def list_ssh_keys(
             detail="Only admins can list SSH keys"
         )
     
-    ssh_keys_dir = Path("ssh_keys")
-    if not ssh_keys_dir.exists():
-        return {"keys": []}
-    
-    keys = []
-    # Look for all supported key types
-    key_patterns = ["*_id_rsa", "*_id_ed25519", "*_id_ecdsa"]
-    
-    for pattern in key_patterns:
-        for key_file in ssh_keys_dir.glob(pattern):
-            # Extract key name and type from filename
-            key_name = key_file.stem
-            if key_file.name.endswith("_id_rsa"):
-                key_name = key_name.replace("_id_rsa", "")
-                key_type = "rsa"
-            elif key_file.name.endswith("_id_ed25519"):
-                key_name = key_name.replace("_id_ed25519", "")
-                key_type = "ed25519"
-            elif key_file.name.endswith("_id_ecdsa"):
-                key_name = key_name.replace("_id_ecdsa", "")
-                key_type = "ecdsa"
-            else:
-                continue
-                
-            public_key_file = key_file.with_suffix(".pub")
-            
-            if public_key_file.exists():
-                try:
-                    with open(public_key_file, 'r') as f:
-                        public_key = f.read().strip()
-                    
-                    keys.append({
-                        "name": key_name,
-                        "type": key_type,
-                        "private_key_path": str(key_file),
-                        "public_key": public_key,
-                        "created": key_file.stat().st_mtime
-                    })
-                except Exception:
-                    continue
-    
+    keys = [
+        {k: entry[k] for k in ("name", "type", "private_key_path", "public_key", "created")}
+        for by_type in ssh_key_index().values()
+        for entry in by_type.values()
+    ]
     return {"keys": keys}
 
+def _validate_server_auth(server_create: ServerCreate):
+    """Check the auth method and the fields it requires on a new server."""
+    if server_create.auth_method == "password":
+        if not server_create.password:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Password is required for password authentication"
+            )
+        if len(server_create.password) < 6:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Password must be at least 6 characters long"
+            )
+    elif server_create.auth_method == "ssh_key":
+        if not server_create.ssh_key_path:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="SSH key path is required for SSH key authentication"
+            )
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid authentication method. Use 'password' or 'ssh_key'"
+        )
+
 @router.post("/", response_model=ServerResponse)
 def create_server(
     server_create: ServerCreate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -202,80 +176,72 @@ def create_server(
         )
     
     # Check if server name already exists
-    existing_server = db.query(Server).filter(Server.name == server_create.name).first()
-    if existing_server:
+    name_taken = db.query(db.query(Server.id).filter(Server.name == server_create.name).exists()).scalar()
+    if name_taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Server name already exists"
         )
     
-    # Validate group_ids if provided
+    # Validate group_ids if provided; the same rows are attached below
+    groups = []
     if server_create.group_ids:
         groups = db.query(ServerGroup).filter(ServerGroup.id.in_(server_create.group_ids)).all()
-        if len(groups) != len(server_create.group_ids):
+        if len(groups) != len(set(server_create.group_ids)):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="One or more server group IDs are invalid"
             )
     
     # Validate authentication method and required fields
-    if server_create.auth_method == "password":
-        if not server_create.password:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Password is required for password authentication"
-            )
-        if len(server_create.password) < 6:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Password must be at least 6 characters long"
-            )
-    elif server_create.auth_method == "ssh_key":
-        if not server_create.ssh_key_path:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="SSH key path is required for SSH key authentication"
-            )
-    else:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid authentication method. Use 'password' or 'ssh_key'"
-        )
-    
-    # Detect OS automatically
-    print(f"🔍 Detecting OS for server {server_create.name} ({server_create.ip})")
-    detected_os, detection_method = detect_os_automatically(
-        ip=server_create.ip,
-        username=server_create.username,
-        password=server_create.password,
-        ssh_key_path=server_create.ssh_key_path
-    )
-    print(f"🖥️  Detected OS: {detected_os} (method: {detection_method})")
+    _validate_server_auth(server_create)
     
     # Create new server
     vault = SecretsVault.get()
+    # Both bcrypt hashes run side by side rather than back to back
+    password_hash, passphrase_hash = get_password_hashes(server_create.password, server_create.ssh_key_passphrase)
     new_server = Server(
         name=server_create.name,
         ip=server_create.ip,
         username=server_create.username,
         auth_method=server_create.auth_method,
-        password_hash=get_password_hash(server_create.password) if server_create.password else None,
+        password_hash=password_hash,
         password_encrypted=vault.encrypt_to_str(server_create.password) if server_create.password else None,
         ssh_key_path=server_create.ssh_key_path,
-        ssh_key_passphrase=get_password_hash(server_create.ssh_key_passphrase) if server_create.ssh_key_passphrase else None,
-        detected_os=detected_os,
-        os_detection_method=detection_method
+        ssh_key_passphrase=passphrase_hash,
+        # Filled in by the background OS detection scheduled below
+        detected_os=None,
+        os_detection_method="pending"
     )
     
     # Add groups if provided
-    if server_create.group_ids:
-        groups = db.query(ServerGroup).filter(ServerGroup.id.in_(server_create.group_ids)).all()
+    if groups:
         new_server.groups = groups
     
     db.add(new_server)
     db.commit()
     db.refresh(new_server)
     
+    def schedule_os_detection():
+        # The key deployment below detects the OS over its own SSH session; only
+        # fall back to a separate detection (after the response) if it couldn't.
+        if new_server.detected_os:
+            if db.is_modified(new_server):
+                try:
+                    db.commit()
+                except Exception as e:
+                    db.rollback()
+                    logger.warning("Failed to store detected OS for %s: %s", new_server.name, e)
+            return
+        background_tasks.add_task(
+            _detect_and_update_os,
+            new_server.id,
+            server_create.ip,
+            server_create.username,
+            server_create.password,
+            server_create.ssh_key_path,
+        )
+    
     # Log server creation
     AuditLogger.log_user_action(
         db=db,
@@ -299,11 +265,10 @@ def create_server(
         ssh_keys_dir.mkdir(exist_ok=True)
         
         # Generate a unique SSH key pair for this server
-        print(f"🔑 Generating unique SSH key pair for server {new_server.name}")
+        logger.info("Generating unique SSH key pair for server %s", new_server.name)
         
-        import subprocess
         key_name = f"auto_generated_{new_server.name.lower().replace('-', '_')}"
-        print(f"DEBUG: Generated key_name: '{key_name}' for server '{new_server.name}'")
+        logger.debug("Generated key_name: '%s' for server '%s'", key_name, new_server.name)
         
         # Get configured SSH key type
         key_type = get_ssh_key_type()
@@ -311,39 +276,30 @@ def create_server(
         
         private_key_path = ssh_keys_dir / f"{key_name}_{key_params['file_suffix']}"
         public_key_path = ssh_keys_dir / f"{key_name}_{key_params['file_suffix']}.pub"
-        print(f"DEBUG: Private key path: {private_key_path}")
-        print(f"DEBUG: Public key path: {public_key_path}")
+        logger.debug("Private key path: %s", private_key_path)
+        logger.debug("Public key path: %s", public_key_path)
         
         # Check if key already exists for this server
         if private_key_path.exists():
-            print(f"🔑 SSH key already exists for {new_server.name}, using existing key")
+            logger.info("SSH key already exists for %s, using existing key", new_server.name)
         else:
-            # Generate SSH key pair with configurable parameters
-            cmd = [
-                "ssh-keygen", "-t", key_params["type"],
-                "-f", str(private_key_path), "-N", "", 
-                "-C", f"{key_params['comment_prefix']}-{new_server.name}"
-            ]
-            
-            # Add bits parameter for RSA and ECDSA
-            if key_params["bits"]:
-                cmd.extend(["-b", key_params["bits"]])
-            
-            # Add PEM format for RSA (Ed25519 and ECDSA use OpenSSH format by default)
-            if key_params["type"] == "rsa":
-                cmd.extend(["-m", "PEM"])
-            
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                print(f"✅ SSH key pair generated: {key_name}")
-            else:
-                print(f"❌ Failed to generate SSH key: {result.stderr}")
+            # Generate SSH key pair in-process with configurable parameters
+            try:
+                create_ssh_key_files(
+                    private_key_path,
+                    public_key_path,
+                    key_params,
+                    f"{key_params['comment_prefix']}-{new_server.name}",
+                )
+                logger.info("SSH key pair generated: %s", key_name)
+            except Exception as e:
+                logger.warning("Failed to generate SSH key: %s", e)
+                schedule_os_detection()
                 return new_server
         
         # Deploy the key to the server
-        print(f"🚀 Auto-deploying SSH key '{key_name}' to server {new_server.name}")
-        print(f"DEBUG: About to call deploy_ssh_key_internal with key_name='{key_name}', server_id={new_server.id}")
+        logger.info("Auto-deploying SSH key '%s' to server %s", key_name, new_server.name)
+        logger.debug("About to call deploy_ssh_key_internal with key_name='%s', server_id=%s", key_name, new_server.id)
         
         # Log SSH key deployment attempt
         auth_logger.log_ssh_key_deployment(
@@ -357,11 +313,11 @@ def create_server(
         # Deploy the key using the existing logic
         deploy_result = deploy_ssh_key_internal(key_name, new_server.id, db)
         
-        print(f"DEBUG: Deploy result for {new_server.name}: {deploy_result}")
+        logger.debug("Deploy result for %s: %s", new_server.name, deploy_result)
         
         if deploy_result["status"] == "deployed":
-            print(f"✅ SSH key '{key_name}' successfully deployed to {new_server.name}")
-            print(f"🔄 Server {new_server.name} auth_method updated to 'ssh_key'")
+            logger.info("SSH key '%s' successfully deployed to %s", key_name, new_server.name)
+            logger.info("Server %s auth_method updated to 'ssh_key'", new_server.name)
             
             # Log successful deployment
             auth_logger.log_ssh_key_deployment(
@@ -372,8 +328,8 @@ def create_server(
                 details={"action": "deployment_success", "user_id": current_user.id}
             )
         else:
-            print(f"❌ SSH key deployment FAILED for {new_server.name}: {deploy_result}")
-            print(f"❌ Error message: {deploy_result.get('message', 'Unknown error')}")
+            logger.warning("SSH key deployment FAILED for %s: %s", new_server.name, deploy_result)
+            logger.warning("Error message: %s", deploy_result.get('message', 'Unknown error'))
             
             # Log failed deployment
             auth_logger.log_ssh_key_deployment(
@@ -389,13 +345,152 @@ def create_server(
             )
     
     except Exception as e:
-        print(f"⚠️ SSH key auto-deployment failed: {e}")
+        logger.warning("SSH key auto-deployment failed: %s", e)
         # Don't fail server creation, just log the error
     
-    # Load group information for response
-    db.refresh(new_server)
+    schedule_os_detection()
+    
     return new_server
 
+@router.post("/bulk", response_model=List[ServerResponse])
+def create_servers_bulk(
+    server_creates: List[ServerCreate],
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Create several servers in one transaction.
+    
+    Validation matches create_server and is all-or-nothing. SSH keys are not
+    auto-deployed here (that needs a connection per server); use
+    /deploy-ssh-key afterwards. OS detection runs in the background.
+    """
+    # Only admins can create servers
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can create servers"
+        )
+    
+    if not server_creates:
+        return []
+    
+    for server_create in server_creates:
+        _validate_server_auth(server_create)
+    
+    # Check name collisions within the batch and against the table in one query
+    names = [sc.name for sc in server_creates]
+    if len(set(names)) != len(names):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Duplicate server names in request"
+        )
+    taken = [name for (name,) in db.query(Server.name).filter(Server.name.in_(names)).all()]
+    if taken:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Server name already exists: {', '.join(sorted(taken))}"
+        )
+    
+    # Validate all referenced groups with one query
+    group_ids = {gid for sc in server_creates for gid in (sc.group_ids or [])}
+    groups_by_id = {}
+    if group_ids:
+        groups_by_id = {g.id: g for g in db.query(ServerGroup).filter(ServerGroup.id.in_(group_ids)).all()}
+        if len(groups_by_id) != len(group_ids):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="One or more server group IDs are invalid"
+            )
+    
+    # Hash every secret in the batch concurrently
+    vault = SecretsVault.get()
+    hashes = get_password_hashes(*[
+        secret for sc in server_creates for secret in (sc.password, sc.ssh_key_passphrase)
+    ])
+    new_servers = []
+    for i, server_create in enumerate(server_creates):
+        new_server = Server(
+            name=server_create.name,
+            ip=server_create.ip,
+            username=server_create.username,
+            auth_method=server_create.auth_method,
+            password_hash=hashes[2 * i],
+            password_encrypted=vault.encrypt_to_str(server_create.password) if server_create.password else None,
+            ssh_key_path=server_create.ssh_key_path,
+            ssh_key_passphrase=hashes[2 * i + 1],
+            detected_os=None,
+            os_detection_method="pending"
+        )
+        if server_create.group_ids:
+            new_server.groups = [groups_by_id[gid] for gid in dict.fromkeys(server_create.group_ids)]
+        new_servers.append(new_server)
+    
+    db.add_all(new_servers)
+    db.flush()
+    server_ids = [server.id for server in new_servers]
+    audit_details = [
+        {
+            "server_name": server.name,
+            "server_ip": server.ip,
+            "username": server.username,
+            "auth_method": server.auth_method,
+            "groups": [g.name for g in server.groups]
+        }
+        for server in new_servers
+    ]
+    db.commit()
+    
+    for server_id, details, server_create in zip(server_ids, audit_details, server_creates):
+        AuditLogger.log_user_action(
+            db=db,
+            user=current_user,
+            action=AuditActions.SERVER_CREATE,
+            resource_type="server",
+            resource_id=server_id,
+            details=details,
+            success=True
+        )
+        background_tasks.add_task(
+            _detect_and_update_os,
+            server_id,
+            server_create.ip,
+            server_create.username,
+            server_create.password,
+            server_create.ssh_key_path,
+        )
+    
+    # Reload the committed rows and their groups in two queries for the response
+    servers = {
+        server.id: server
+        for server in db.query(Server).options(selectinload(Server.groups)).filter(Server.id.in_(server_ids)).all()
+    }
+    return [servers[server_id] for server_id in server_ids]
+
+def _detect_and_update_os(server_id: int, ip: str, username: str, password: Optional[str], ssh_key_path: Optional[str]):
+    """Background task: detect a new server's OS and store it on the row."""
+    logger.info("Detecting OS for server %s (%s)", server_id, ip)
+    detected_os, detection_method = detect_os_automatically(
+        ip=ip,
+        username=username,
+        password=password,
+        ssh_key_path=ssh_key_path
+    )
+    logger.info("Detected OS: %s (method: %s)", detected_os, detection_method)
+    db = SessionLocal()
+    try:
+        db.query(Server).filter(Server.id == server_id).update(
+            {"detected_os": detected_os, "os_detection_method": detection_method[:20]},
+            synchronize_session=False,
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning("Failed to store detected OS for server %s: %s", server_id, e)
+    finally:
+        db.close()
+
 @router.get("/", response_model=ServerListResponse)
 def get_servers(
     skip: int = Query(0, ge=0),
@@ -410,10 +505,19 @@ def get_servers(
             detail="Only admins can list all servers"
         )
     
-    servers = db.query(Server).options(
-        joinedload(Server.groups)
+    # selectinload keeps LIMIT counting servers rather than server x group rows;
+    # the total rides along as a COUNT(*) OVER () column.
+    rows = db.query(Server, func.count().over().label("total")).options(
+        selectinload(Server.groups)
     ).offset(skip).limit(limit).all()
-    total = db.query(Server).count()
+    servers = [row[0] for row in rows]
+    if rows:
+        total = rows[0].total
+    elif skip:
+        # Page past the end: no row carries the window total, fall back to a count
+        total = db.query(func.count(Server.id)).scalar() or 0
+    else:
+        total = 0
     
     return ServerListResponse(servers=servers, total=total)
 
@@ -430,9 +534,7 @@ def get_server(
             detail="Only admins can view server details"
         )
     
-    server = db.query(Server).options(
-        joinedload(Server.groups)
-    ).filter(Server.id == server_id).first()
+    server = db.get(Server, server_id, options=[selectinload(Server.groups)])
     if server is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -454,7 +556,7 @@ def update_server(
             detail="Only admins can update servers"
         )
     
-    server = db.query(Server).filter(Server.id == server_id).first()
+    server = db.get(Server, server_id)
     if server is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -463,8 +565,8 @@ def update_server(
     
     # Check if name is being changed and if it already exists
     if server_update.name and server_update.name != server.name:
-        existing_server = db.query(Server).filter(Server.name == server_update.name).first()
-        if existing_server:
+        name_taken = db.query(db.query(Server.id).filter(Server.name == server_update.name).exists()).scalar()
+        if name_taken:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Server name already exists"
@@ -495,14 +597,16 @@ def update_server(
         server.username = server_update.username
     if server_update.auth_method is not None:
         server.auth_method = server_update.auth_method
+    # Both bcrypt hashes run side by side rather than back to back
+    password_hash, passphrase_hash = get_password_hashes(server_update.password, server_update.ssh_key_passphrase)
     if server_update.password is not None:
         vault = SecretsVault.get()
-        server.password_hash = get_password_hash(server_update.password) if server_update.password else None
+        server.password_hash = password_hash
         server.password_encrypted = vault.encrypt_to_str(server_update.password) if server_update.password else None
     if server_update.ssh_key_path is not None:
         server.ssh_key_path = server_update.ssh_key_path
     if server_update.ssh_key_passphrase is not None:
-        server.ssh_key_passphrase = get_password_hash(server_update.ssh_key_passphrase) if server_update.ssh_key_passphrase else None
+        server.ssh_key_passphrase = passphrase_hash
     
     # Update groups if provided
     if server_update.group_ids is not None:
@@ -558,51 +662,20 @@ def delete_server(
     # Log server deletion before deleting
     server_name = server.name
     server_ip = server.ip
+    ssh_key_path = server.ssh_key_path
     
-    # Clean up SSH key files if they exist
-    if server.ssh_key_path:
-        try:
-            import os
-            from pathlib import Path
-            
-            # Get the key file paths
-            private_key_path = Path(server.ssh_key_path)
-            public_key_path = private_key_path.with_suffix('.pub')
-            
-            # Delete private key file
-            if private_key_path.exists():
-                os.remove(private_key_path)
-                print(f"🗑️ Deleted private key: {private_key_path}")
-            
-            # Delete public key file
-            if public_key_path.exists():
-                os.remove(public_key_path)
-                print(f"🗑️ Deleted public key: {public_key_path}")
-                
-        except Exception as e:
-            print(f"⚠️ Failed to delete SSH key files for {server_name}: {e}")
-            # Don't fail server deletion if key cleanup fails
+    # Delete related records first to avoid foreign key constraints. Bulk
+    # DELETEs with the session sync pass turned off, so no rows are loaded or
+    # matched in the identity map; any failure propagates and rolls back.
+    no_sync = {"synchronize_session": False}
+    db.execute(delete(ScriptExecution).where(ScriptExecution.server_id == server_id), execution_options=no_sync)
+    logger.info("Deleted script executions for server %s", server_name)
     
-    # Delete related records first to avoid foreign key constraints
-    try:
-        # Delete script executions first
-        from models import ScriptExecution
-        db.query(ScriptExecution).filter(ScriptExecution.server_id == server_id).delete()
-        print(f"🗑️ Deleted script executions for server {server_name}")
-        
-        # Delete server health records
-        from models import ServerHealth
-        db.query(ServerHealth).filter(ServerHealth.server_id == server_id).delete()
-        print(f"🗑️ Deleted health records for server {server_name}")
-        
-        # Delete server group associations
-        from models import ServerGroupAssociation
-        db.query(ServerGroupAssociation).filter(ServerGroupAssociation.server_id == server_id).delete()
-        print(f"🗑️ Deleted group associations for server {server_name}")
-        
-    except Exception as e:
-        print(f"⚠️ Failed to delete related records for {server_name}: {e}")
-        # Continue with server deletion even if related records cleanup fails
+    db.execute(delete(ServerHealth).where(ServerHealth.server_id == server_id), execution_options=no_sync)
+    logger.info("Deleted health records for server %s", server_name)
+    
+    db.execute(delete(ServerGroupAssociation).where(ServerGroupAssociation.server_id == server_id), execution_options=no_sync)
+    logger.info("Deleted group associations for server %s", server_name)
     
     # Log server deletion before deleting
     AuditLogger.log_user_action(
@@ -619,54 +692,90 @@ def delete_server(
         success=True
     )
     
-    # Now delete the server
-    db.delete(server)
+    # Now delete the server. A plain DELETE: db.delete() would first SELECT the
+    # groups and health_records collections just cleared above. Everything
+    # commits together.
+    db.execute(delete(Server).where(Server.id == server_id), execution_options=no_sync)
     db.commit()
     
+    # Clean up SSH key files only once the rows are gone, so a failed delete
+    # doesn't leave a server whose key has been removed
+    if ssh_key_path:
+        try:
+            # Removes the pair and drops it from the in-memory key index
+            for path in remove_ssh_key_files(ssh_key_path):
+                logger.info("Deleted SSH key file: %s", path)
+        except Exception as e:
+            logger.warning("Failed to delete SSH key files for %s: %s", server_name, e)
+            # Don't fail server deletion if key cleanup fails
+    
     return {"message": "Server deleted successfully"}
 
+def _sftp_add_authorized_key(ssh_client, public_key: str) -> bool:
+    """
+    Add public_key to ~/.ssh/authorized_keys over a single SFTP session.
+    Returns False if the key was already present, True if it was appended.
+    """
+    # Match on "type base64" only, so a differing comment doesn't duplicate the key
+    key_id = " ".join(public_key.split()[:2])
+    sftp = ssh_client.open_sftp()
+    try:
+        try:
+            sftp.stat(".ssh")
+        except IOError:
+            sftp.mkdir(".ssh", mode=0o700)
+        
+        authorized_keys = ".ssh/authorized_keys"
+        try:
+            with sftp.open(authorized_keys, "r") as f:
+                existing = f.read().decode("utf-8", errors="ignore")
+        except IOError:
+            existing = None
+        
+        if existing and any(key_id in line for line in existing.splitlines()):
+            return False
+        
+        prefix = "\n" if existing and not existing.endswith("\n") else ""
+        with sftp.open(authorized_keys, "a") as f:
+            f.write(f"{prefix}{public_key}\n")
+        if existing is None:
+            try:
+                sftp.chmod(authorized_keys, 0o600)
+            except IOError:
+                # Windows OpenSSH ignores POSIX modes
+                pass
+        return True
+    finally:
+        sftp.close()
+
 def deploy_ssh_key_internal(key_name: str, server_id: int, db: Session):
     """
     Internal function to deploy SSH key (no authentication check)
     """
-    print(f"DEBUG: deploy_ssh_key_internal called with key_name='{key_name}', server_id={server_id}")
+    logger.debug("deploy_ssh_key_internal called with key_name='%s', server_id=%s", key_name, server_id)
     
     # Get the server
     server = db.query(Server).filter(Server.id == server_id).first()
     if not server:
         return {"status": "error", "message": "Server not found"}
     
-    print(f"DEBUG: Deploying to server '{server.name}' (ID: {server.id})")
-    
-    # Check if SSH key exists (try different key types)
-    ssh_keys_dir = Path("ssh_keys")
-    key_types = ["rsa", "ed25519", "ecdsa"]
-    public_key_path = None
-    private_key_path = None
-    detected_key_type = None
+    logger.debug("Deploying to server '%s' (ID: %s)", server.name, server.id)
     
-    for key_type in key_types:
-        key_params = get_ssh_key_parameters(key_type)
-        test_public_path = ssh_keys_dir / f"{key_name}_{key_params['file_suffix']}.pub"
-        test_private_path = ssh_keys_dir / f"{key_name}_{key_params['file_suffix']}"
-        
-        if test_public_path.exists() and test_private_path.exists():
-            public_key_path = test_public_path
-            private_key_path = test_private_path
-            detected_key_type = key_type
-            break
+    # Check if SSH key exists (any key type) via the cached directory index
+    key_entry = find_ssh_key(key_name)
+    public_key_path = key_entry["public_key_path"] if key_entry else None
+    private_key_path = key_entry["private_key_path"] if key_entry else None
+    detected_key_type = key_entry["type"] if key_entry else None
     
-    print(f"DEBUG: Looking for public key at: {public_key_path}")
-    print(f"DEBUG: Looking for private key at: {private_key_path}")
-    print(f"DEBUG: Detected key type: {detected_key_type}")
+    logger.debug("Looking for public key at: %s", public_key_path)
+    logger.debug("Looking for private key at: %s", private_key_path)
+    logger.debug("Detected key type: %s", detected_key_type)
     
-    if not public_key_path or not public_key_path.exists():
+    if key_entry is None:
         return {"status": "error", "message": f"SSH key '{key_name}' not found"}
     
     try:
-        # Read the public key
-        with open(public_key_path, 'r') as f:
-            public_key = f.read().strip()
+        public_key = key_entry["public_key"]
         
         # Create SSH client
         ssh_client = paramiko.SSHClient()
@@ -678,14 +787,17 @@ def deploy_ssh_key_internal(key_name: str, server_id: int, db: Session):
         # Try SSH key first (if available)
         if server.ssh_key_path and os.path.exists(server.ssh_key_path):
             try:
-                private_key = paramiko.RSAKey.from_private_key_file(server.ssh_key_path, password=None)
+                # Load with the class matching the key file, so ed25519/ecdsa keys
+                # don't fail here and fall through to a second (password) handshake
+                key_class = get_paramiko_key_class(detect_key_type_from_file(server.ssh_key_path))
+                private_key = key_class.from_private_key_file(server.ssh_key_path, password=None)
                 ssh_client.connect(
                     server.ip,
                     username=server.username,
                     pkey=private_key,
                     timeout=10
                 )
-                print(f"Connected to server {server.name} using existing SSH key")
+                logger.info("Connected to server %s using existing SSH key", server.name)
                 connection_success = True
                 
                 # Log successful SSH key connection
@@ -697,7 +809,7 @@ def deploy_ssh_key_internal(key_name: str, server_id: int, db: Session):
                     details={"action": "ssh_key_deployment_connection", "key_path": server.ssh_key_path}
                 )
             except Exception as e:
-                print(f"SSH key connection failed: {e}, trying password...")
+                logger.warning("SSH key connection failed: %s, trying password...", e)
                 
                 # Log failed SSH key connection
                 auth_logger.log_auth_attempt(
@@ -720,7 +832,7 @@ def deploy_ssh_key_internal(key_name: str, server_id: int, db: Session):
                     password=password,
                     timeout=10
                 )
-                print(f"Connected to server {server.name} using password authentication")
+                logger.info("Connected to server %s using password authentication", server.name)
                 connection_success = True
                 
                 # Log successful password connection
@@ -747,93 +859,52 @@ def deploy_ssh_key_internal(key_name: str, server_id: int, db: Session):
             return {"status": "error", "message": "Cannot connect to server"}
         
         # Detect OS for proper SSH key deployment
+        # cmd.exe echoes "Windows_NT; uname -s" verbatim, POSIX shells run both
         is_windows = False
+        os_probe = ""
         try:
-            stdin, stdout, stderr = ssh_client.exec_command("echo %OS%")
-            output = stdout.read().decode().strip()
-            if "Windows" in output or "NT" in output:
+            stdin, stdout, stderr = ssh_client.exec_command("echo %OS%; uname -s")
+            os_probe = stdout.read().decode('utf-8', errors='ignore').strip()
+            if "Windows" in os_probe or "NT" in os_probe:
                 is_windows = True
         except:
             pass
         
+        # Record the OS on the row while this session is open, so server
+        # creation doesn't need a separate detection connection
+        detected_os = None
+        
         if is_windows:
             # Windows SSH key deployment
-            print(f"Deploying SSH key to Windows server {server.name}")
-            
-            # Create .ssh directory if it doesn't exist (Windows)
-            print(f"DEBUG: Creating .ssh directory for Windows")
-            stdin, stdout, stderr = ssh_client.exec_command("if not exist \"%USERPROFILE%\\.ssh\" mkdir \"%USERPROFILE%\\.ssh\"")
-            print(f"DEBUG: Create .ssh directory result: {stdout.read().decode('utf-8', errors='ignore')}")
-            
-            # Check if authorized_keys exists, create if not (Windows)
-            print(f"DEBUG: Checking if authorized_keys exists")
-            stdin, stdout, stderr = ssh_client.exec_command("if exist \"%USERPROFILE%\\.ssh\\authorized_keys\" echo exists")
-            auth_keys_exists = stdout.read().decode('utf-8', errors='ignore').strip()
-            print(f"DEBUG: authorized_keys exists: {auth_keys_exists}")
-            
-            if not auth_keys_exists:
-                # Create empty authorized_keys file (Windows)
-                print(f"DEBUG: Creating empty authorized_keys file")
-                stdin, stdout, stderr = ssh_client.exec_command("echo. > \"%USERPROFILE%\\.ssh\\authorized_keys\"")
-                print(f"DEBUG: Create authorized_keys result: {stdout.read().decode('utf-8', errors='ignore')}")
-            
-            # Check if key already exists (Windows)
-            print(f"DEBUG: Checking if key already exists")
-            stdin, stdout, stderr = ssh_client.exec_command(f"findstr /C:\"{public_key}\" \"%USERPROFILE%\\.ssh\\authorized_keys\"")
-            key_exists = stdout.channel.recv_exit_status() == 0
-            print(f"DEBUG: Key already exists: {key_exists}")
-            
-            if key_exists:
-                ssh_client.close()
-                return {
-                    "status": "already_exists",
-                    "message": "SSH key already deployed to server",
-                    "key_name": key_name,
-                    "server_name": server.name
-                }
-            
-            # Add the public key to authorized_keys (Windows) - use PowerShell for better handling
-            print(f"DEBUG: Adding public key to authorized_keys")
-            stdin, stdout, stderr = ssh_client.exec_command(f"powershell -Command \"Add-Content -Path '%USERPROFILE%\\.ssh\\authorized_keys' -Value '{public_key}'\"")
-            add_result = stdout.channel.recv_exit_status()
-            print(f"DEBUG: Add key result: {add_result}")
-            print(f"DEBUG: Add key stdout: {stdout.read().decode('utf-8', errors='ignore')}")
-            print(f"DEBUG: Add key stderr: {stderr.read().decode('utf-8', errors='ignore')}")
-            
-            if add_result != 0:
-                ssh_client.close()
-                return {"status": "error", "message": "Failed to add key to authorized_keys"}
+            logger.info("Deploying SSH key to Windows server %s", server.name)
+            detected_os = "windows"
+            server.detected_os = detected_os
+            server.os_detection_method = "ssh_connect"
         else:
             # Linux SSH key deployment
-            print(f"Deploying SSH key to Linux server {server.name}")
-            
-            # Create .ssh directory if it doesn't exist
-            ssh_client.exec_command("mkdir -p ~/.ssh")
-            ssh_client.exec_command("chmod 700 ~/.ssh")
-            
-            # Check if authorized_keys exists, create if not
-            stdin, stdout, stderr = ssh_client.exec_command("ls ~/.ssh/authorized_keys")
-            if stdout.channel.recv_exit_status() != 0:
-                # Create empty authorized_keys file
-                ssh_client.exec_command("touch ~/.ssh/authorized_keys")
-                ssh_client.exec_command("chmod 600 ~/.ssh/authorized_keys")
-            
-            # Check if key already exists
-            stdin, stdout, stderr = ssh_client.exec_command(f"grep -F '{public_key}' ~/.ssh/authorized_keys")
-            if stdout.channel.recv_exit_status() == 0:
-                ssh_client.close()
-                return {
-                    "status": "already_exists",
-                    "message": "SSH key already deployed to server",
-                    "key_name": key_name,
-                    "server_name": server.name
-                }
-            
-            # Add the public key to authorized_keys
-            stdin, stdout, stderr = ssh_client.exec_command(f"echo '{public_key}' >> ~/.ssh/authorized_keys")
-            if stdout.channel.recv_exit_status() != 0:
-                ssh_client.close()
-                return {"status": "error", "message": "Failed to add key to authorized_keys"}
+            logger.info("Deploying SSH key to Linux server %s", server.name)
+            detected_os = classify_uname(os_probe.splitlines()[-1]) if os_probe else None
+            if detected_os:
+                server.detected_os = detected_os
+                server.os_detection_method = "ssh_connect"
+        
+        # Read, dedupe and append authorized_keys over one SFTP session
+        try:
+            key_added = _sftp_add_authorized_key(ssh_client, public_key)
+        except Exception as e:
+            logger.warning("Failed to update authorized_keys on %s: %s", server.name, e)
+            ssh_client.close()
+            return {"status": "error", "message": "Failed to add key to authorized_keys", "detected_os": detected_os}
+        
+        if not key_added:
+            ssh_client.close()
+            return {
+                "status": "already_exists",
+                "message": "SSH key already deployed to server",
+                "key_name": key_name,
+                "server_name": server.name,
+                "detected_os": detected_os
+            }
         
         # Test the connection with the new key
         ssh_client.close()
@@ -841,34 +912,24 @@ def deploy_ssh_key_internal(key_name: str, server_id: int, db: Session):
         # For Windows servers, skip the test connection as it often fails due to key format issues
         # The key deployment was successful (we got here), so we can proceed
         if is_windows:
-            print(f"DEBUG: Skipping test connection for Windows server (key deployment was successful)")
+            logger.debug("Skipping test connection for Windows server (key deployment was successful)")
         else:
             # Try to connect with the newly deployed key (Linux servers)
             test_client = paramiko.SSHClient()
             test_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
             
-            # Load the private key we just deployed
-            private_key_path = ssh_keys_dir / f"{key_name}_id_rsa"
-            print(f"DEBUG: Loading private key from: {private_key_path}")
-            print(f"DEBUG: Private key file exists: {private_key_path.exists()}")
-            print(f"DEBUG: Private key file size: {private_key_path.stat().st_size if private_key_path.exists() else 'N/A'}")
+            # Load the private key we just deployed, using the type found in the key index
+            logger.debug("Loading %s private key from: %s", detected_key_type, private_key_path)
             
             try:
-                # Try loading with explicit password=None
-                test_private_key = paramiko.RSAKey.from_private_key_file(str(private_key_path), password=None)
-                print(f"DEBUG: Successfully loaded private key with password=None")
+                test_private_key = get_paramiko_key_class(detected_key_type).from_private_key_file(private_key_path, password=None)
+                logger.debug("Successfully loaded private key")
             except Exception as e:
-                print(f"DEBUG: Failed to load private key with password=None: {e}")
-                try:
-                    # Try loading without password parameter
-                    test_private_key = paramiko.RSAKey.from_private_key_file(str(private_key_path), password=None)
-                    print(f"DEBUG: Successfully loaded private key without password parameter")
-                except Exception as e2:
-                    print(f"DEBUG: Failed to load private key without password parameter: {e2}")
-                    test_client.close()
-                    return {"status": "error", "message": f"Failed to load private key: {str(e2)}"}
+                logger.debug("Failed to load private key: %s", e)
+                test_client.close()
+                return {"status": "error", "message": f"Failed to load private key: {str(e)}"}
             
-            print(f"DEBUG: Attempting to connect with private key to {server.ip}")
+            logger.debug("Attempting to connect with private key to %s", server.ip)
             try:
                 test_client.connect(
                     server.ip,
@@ -876,41 +937,42 @@ def deploy_ssh_key_internal(key_name: str, server_id: int, db: Session):
                     pkey=test_private_key,
                     timeout=10
                 )
-                print(f"DEBUG: Successfully connected with private key")
+                logger.debug("Successfully connected with private key")
             except Exception as e:
-                print(f"DEBUG: Connection failed with error: {e}")
-                print(f"DEBUG: Error type: {type(e)}")
+                logger.debug("Connection failed with error: %s", e)
+                logger.debug("Error type: %s", type(e))
                 test_client.close()
                 return {"status": "error", "message": f"Failed to connect with private key: {str(e)}"}
             
             # Test a simple command
-            print(f"DEBUG: Testing command execution")
+            logger.debug("Testing command execution")
             stdin, stdout, stderr = test_client.exec_command("echo 'SSH key deployment successful'")
             command_result = stdout.channel.recv_exit_status()
-            print(f"DEBUG: Command result: {command_result}")
+            logger.debug("Command result: %s", command_result)
             
             if command_result != 0:
-                print(f"DEBUG: Command failed, closing connection")
+                logger.debug("Command failed, closing connection")
                 test_client.close()
                 return {"status": "error", "message": "Key deployment succeeded but connection test failed"}
             
-            print(f"DEBUG: Command succeeded, closing test connection")
+            logger.debug("Command succeeded, closing test connection")
             test_client.close()
         
         # Update server to use SSH key authentication
-        print(f"DEBUG: Updating server auth_method to ssh_key")
+        logger.debug("Updating server auth_method to ssh_key")
         server.auth_method = "ssh_key"
-        server.ssh_key_path = str(private_key_path)
+        server.ssh_key_path = private_key_path
         db.commit()
         
-        print(f"✅ Server {server.name} auth_method updated to 'ssh_key' after successful deployment")
+        logger.info("Server %s auth_method updated to 'ssh_key' after successful deployment", server.name)
         
         return {
             "status": "deployed",
             "message": "SSH key deployed successfully to server",
             "key_name": key_name,
             "server_name": server.name,
-            "public_key": public_key
+            "public_key": public_key,
+            "detected_os": detected_os
         }
         
     except Exception as e:
@@ -942,20 +1004,16 @@ def deploy_ssh_key(
             detail="Server not found"
         )
     
-    # Check if SSH key exists
-    ssh_keys_dir = Path("ssh_keys")
-    public_key_path = ssh_keys_dir / f"{key_name}_id_rsa.pub"
-    
-    if not public_key_path.exists():
+    # Check if SSH key exists (any key type) via the cached directory index
+    key_entry = find_ssh_key(key_name)
+    if key_entry is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"SSH key '{key_name}' not found"
         )
     
     try:
-        # Read the public key
-        with open(public_key_path, 'r') as f:
-            public_key = f.read().strip()
+        public_key = key_entry["public_key"]
         
         # Create SSH client
         ssh_client = paramiko.SSHClient()
@@ -967,17 +1025,20 @@ def deploy_ssh_key(
         # Try SSH key first (if available)
         if server.ssh_key_path and os.path.exists(server.ssh_key_path):
             try:
-                private_key = paramiko.RSAKey.from_private_key_file(server.ssh_key_path, password=None)
+                # Load with the class matching the key file, so ed25519/ecdsa keys
+                # don't fail here and fall through to a second (password) handshake
+                key_class = get_paramiko_key_class(detect_key_type_from_file(server.ssh_key_path))
+                private_key = key_class.from_private_key_file(server.ssh_key_path, password=None)
                 ssh_client.connect(
                     server.ip,
                     username=server.username,
                     pkey=private_key,
                     timeout=10
                 )
-                print(f"Connected to server {server.name} using existing SSH key")
+                logger.info("Connected to server %s using existing SSH key", server.name)
                 connection_success = True
             except Exception as e:
-                print(f"SSH key connection failed: {e}, trying password...")
+                logger.warning("SSH key connection failed: %s, trying password...", e)
         
         # Fallback to password if SSH key failed or not available
         if not connection_success and server.password_encrypted:
@@ -991,7 +1052,7 @@ def deploy_ssh_key(
                     password=password,
                     timeout=10
                 )
-                print(f"Connected to server {server.name} using password authentication")
+                logger.info("Connected to server %s using password authentication", server.name)
                 connection_success = True
             except Exception as e:
                 raise HTTPException(
@@ -1016,72 +1077,26 @@ def deploy_ssh_key(
         except:
             pass
         
-        if is_windows:
-            # Windows SSH key deployment
-            print(f"Deploying SSH key to Windows server {server.name}")
-            
-            # Create .ssh directory if it doesn't exist (Windows)
-            ssh_client.exec_command("if not exist \"%USERPROFILE%\\.ssh\" mkdir \"%USERPROFILE%\\.ssh\"")
-            
-            # Check if authorized_keys exists, create if not (Windows)
-            stdin, stdout, stderr = ssh_client.exec_command("if exist \"%USERPROFILE%\\.ssh\\authorized_keys\" echo exists")
-            if not stdout.read().decode().strip():
-                # Create empty authorized_keys file (Windows)
-                ssh_client.exec_command("echo. > \"%USERPROFILE%\\.ssh\\authorized_keys\"")
-            
-            # Check if key already exists (Windows)
-            stdin, stdout, stderr = ssh_client.exec_command(f"findstr /C:\"{public_key}\" \"%USERPROFILE%\\.ssh\\authorized_keys\"")
-            if stdout.channel.recv_exit_status() == 0:
-                ssh_client.close()
-                return {
-                    "message": "SSH key already deployed to server",
-                    "key_name": key_name,
-                    "server_name": server.name,
-                    "status": "already_exists"
-                }
-            
-            # Add the public key to authorized_keys (Windows) - use PowerShell for better handling
-            stdin, stdout, stderr = ssh_client.exec_command(f"powershell -Command \"Add-Content -Path '%USERPROFILE%\\.ssh\\authorized_keys' -Value '{public_key}'\"")
-            if stdout.channel.recv_exit_status() != 0:
-                ssh_client.close()
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Failed to add key to authorized_keys"
-                )
-        else:
-            # Linux SSH key deployment
-            print(f"Deploying SSH key to Linux server {server.name}")
-            
-            # Create .ssh directory if it doesn't exist
-            ssh_client.exec_command("mkdir -p ~/.ssh")
-            ssh_client.exec_command("chmod 700 ~/.ssh")
-            
-            # Check if authorized_keys exists, create if not
-            stdin, stdout, stderr = ssh_client.exec_command("ls ~/.ssh/authorized_keys")
-            if stdout.channel.recv_exit_status() != 0:
-                # Create empty authorized_keys file
-                ssh_client.exec_command("touch ~/.ssh/authorized_keys")
-                ssh_client.exec_command("chmod 600 ~/.ssh/authorized_keys")
-            
-            # Check if key already exists
-            stdin, stdout, stderr = ssh_client.exec_command(f"grep -F '{public_key}' ~/.ssh/authorized_keys")
-            if stdout.channel.recv_exit_status() == 0:
-                ssh_client.close()
-                return {
-                    "message": "SSH key already deployed to server",
-                    "key_name": key_name,
-                    "server_name": server.name,
-                    "status": "already_exists"
-                }
-            
-            # Add the public key to authorized_keys
-            stdin, stdout, stderr = ssh_client.exec_command(f"echo '{public_key}' >> ~/.ssh/authorized_keys")
-            if stdout.channel.recv_exit_status() != 0:
-                ssh_client.close()
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Failed to add key to authorized_keys"
-                )
+        logger.info("Deploying SSH key to %s server %s", "Windows" if is_windows else "Linux", server.name)
+        
+        # Read, dedupe and append authorized_keys over one SFTP session
+        try:
+            key_added = _sftp_add_authorized_key(ssh_client, public_key)
+        except Exception as e:
+            ssh_client.close()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to add key to authorized_keys: {str(e)}"
+            )
+        
+        if not key_added:
+            ssh_client.close()
+            return {
+                "message": "SSH key already deployed to server",
+                "key_name": key_name,
+                "server_name": server.name,
+                "status": "already_exists"
+            }
         
         # Test the connection with the new key
         ssh_client.close()
@@ -1091,17 +1106,14 @@ def deploy_ssh_key(
         test_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
         
         # Load the private key we just deployed
-        private_key_path = ssh_keys_dir / f"{key_name}_id_rsa"
-        print(f"DEBUG: Loading private key from: {private_key_path}")
-        print(f"DEBUG: Private key file exists: {private_key_path.exists()}")
-        print(f"DEBUG: Private key file size: {private_key_path.stat().st_size if private_key_path.exists() else 'N/A'}")
+        private_key_path = key_entry["private_key_path"]
+        logger.debug("Loading %s private key from: %s", key_entry["type"], private_key_path)
         
         try:
-            # Load the private key (OpenSSH format should work better)
-            test_private_key = paramiko.RSAKey.from_private_key_file(str(private_key_path), password=None)
-            print(f"DEBUG: Successfully loaded private key")
+            test_private_key = get_paramiko_key_class(key_entry["type"]).from_private_key_file(private_key_path, password=None)
+            logger.debug("Successfully loaded private key")
         except Exception as e:
-            print(f"DEBUG: Failed to load private key: {e}")
+            logger.debug("Failed to load private key: %s", e)
             test_client.close()
             return {"status": "error", "message": f"Failed to load private key: {str(e)}"}
         
@@ -1125,10 +1137,10 @@ def deploy_ssh_key(
         
         # Update server to use SSH key authentication
         server.auth_method = "ssh_key"
-        server.ssh_key_path = str(private_key_path)
+        server.ssh_key_path = private_key_path
         db.commit()
         
-        print(f"✅ Server {server.name} auth_method updated to 'ssh_key' after successful deployment")
+        logger.info("Server %s auth_method updated to 'ssh_key' after successful deployment", server.name)
         
         return {
             "message": "SSH key deployed successfully to server",
@@ -1170,8 +1182,6 @@ def test_server_connection(
             detail="Server not found"
         )
     
-    import time
-    
     try:
         start_time = time.time()
         
@@ -1195,10 +1205,10 @@ def test_server_connection(
                     pkey=private_key,
                     timeout=10
                 )
-                print(f"Test connection to {server.name} using SSH key")
+                logger.info("Test connection to %s using SSH key", server.name)
                 connection_success = True
             except Exception as e:
-                print(f"SSH key test connection failed: {e}, trying password...")
+                logger.warning("SSH key test connection failed: %s, trying password...", e)
         
         # Fallback to password if SSH key failed or not available
         if not connection_success and server.password_encrypted:
@@ -1212,7 +1222,7 @@ def test_server_connection(
                     password=password,
                     timeout=10
                 )
-                print(f"Test connection to {server.name} using password")
+                logger.info("Test connection to %s using password", server.name)
                 connection_success = True
             except Exception as e:
                 raise HTTPException(
@@ -5,6 +5,7 @@ from models import Settings, User
 from schemas import SettingsResponse, SettingsUpdate
 from auth import get_current_user
 from security import admin_ip_guard
+from settings_cache import invalidate_settings_cache
 
 router = APIRouter(dependencies=[Depends(admin_ip_guard)])
 
@@ -35,6 +36,7 @@ def update_settings(payload: SettingsUpdate, db: Session = Depends(get_db), curr
         setattr(row, k, v)
     db.commit()
     db.refresh(row)
+    invalidate_settings_cache()
     return row
 
 
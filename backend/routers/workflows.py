@@ -1088,8 +1088,8 @@ def update_workflow(workflow_id: int, payload: dict, current_user: User = Depend
     
     # Sync schedule changes to APScheduler if trigger_type or schedule fields changed
     if any(field in payload for field in ["trigger_type", "schedule_cron", "schedule_timezone"]):
-        from scheduler import sync_schedules
-        sync_schedules()
+        from scheduler import request_sync
+        request_sync()
 
     # Replace nodes/edges if provided
     if "nodes" in payload or "edges" in payload:
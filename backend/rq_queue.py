@@ -1,20 +1,59 @@
 import os
-from typing import Optional
+import threading
+from typing import Dict, Optional
 
 from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
 from rq import Queue
 
 
+_redis: Optional[Redis] = None
+_async_redis: Optional[AsyncRedis] = None
+_queues: Dict[str, Queue] = {}
+_lock = threading.RLock()
+
+
 def get_redis() -> Redis:
-    """Return a Redis client using REDIS_URL or localhost default."""
-    url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-    # Use raw bytes (decode_responses=False) for full RQ compatibility
-    return Redis.from_url(url, decode_responses=False)
+    """Return the process-wide Redis client using REDIS_URL or localhost default.
+
+    The client (and its connection pool) is created once and shared, so callers
+    on hot paths don't each open a fresh pool.
+    """
+    global _redis
+    if _redis is None:
+        with _lock:
+            if _redis is None:
+                url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+                # Use raw bytes (decode_responses=False) for full RQ compatibility
+                _redis = Redis.from_url(url, decode_responses=False)
+    return _redis
+
+
+def get_async_redis() -> AsyncRedis:
+    """Return the process-wide asyncio Redis client, for use from async endpoints.
+
+    Must only be used from the server's event loop; the client's connections
+    are bound to the loop that first uses them.
+    """
+    global _async_redis
+    if _async_redis is None:
+        with _lock:
+            if _async_redis is None:
+                url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+                _async_redis = AsyncRedis.from_url(url, decode_responses=False)
+    return _async_redis
 
 
 def get_queue(name: Optional[str] = None) -> Queue:
-    """Return an RQ Queue bound to our Redis client."""
-    return Queue(name or "default", connection=get_redis())
+    """Return the cached RQ Queue for `name`, bound to the shared Redis client."""
+    name = name or "default"
+    q = _queues.get(name)
+    if q is None:
+        with _lock:
+            q = _queues.get(name)
+            if q is None:
+                q = _queues[name] = Queue(name, connection=get_redis())
+    return q
 
 
 def acquire_lock(key: str, ttl_seconds: int) -> bool:
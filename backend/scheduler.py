@@ -2,7 +2,7 @@ import threading
 import time
 from datetime import datetime, timezone, timedelta
 from zoneinfo import ZoneInfo
-from typing import Optional
+from typing import Callable, Optional
 
 from sqlalchemy.orm import Session
 from sqlalchemy import func
@@ -35,23 +35,68 @@ def _now_utc() -> datetime:
     return datetime.utcnow().replace(tzinfo=timezone.utc)
 
 
+def _localize(naive: datetime, tz) -> datetime:
+    """Attach tz to a naive wall-clock time from croniter, resolving DST edge cases.
+
+    Ambiguous times (fall-back) take the first occurrence (fold=0); non-existent
+    times (spring-forward gap) are normalized forward through UTC.
+    """
+    return naive.replace(tzinfo=tz, fold=0).astimezone(timezone.utc).astimezone(tz)
+
+
+def _every_n_minutes(n: int) -> Callable[[datetime], datetime]:
+    # Only valid for n dividing 60, where "*/n" slots never straddle an hour boundary
+    return lambda now: now.replace(second=0, microsecond=0) + timedelta(minutes=n - now.minute % n)
+
+
+# Pre-parsed common cron expressions: naive local "now" -> next naive local occurrence
+# strictly after it. Anything not listed here goes through croniter.
+_FAST: dict[str, Callable[[datetime], datetime]] = {
+    "* * * * *": _every_n_minutes(1),
+    "*/5 * * * *": _every_n_minutes(5),
+    "*/10 * * * *": _every_n_minutes(10),
+    "*/15 * * * *": _every_n_minutes(15),
+    "*/30 * * * *": _every_n_minutes(30),
+    "0 * * * *": lambda now: now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1),
+    "0 0 * * *": lambda now: now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1),
+}
+
+
+# Long-lived croniter per schedule: schedule_id -> (cron_expression, timezone, iterator).
+# Rebuilt only when the expression/timezone changes or the iterator has fallen behind.
+_ITER_CACHE: dict = {}
+_ITER_LOCK = threading.Lock()
+
+
 def _compute_next_run(schedule: Schedule, from_time: Optional[datetime] = None) -> Optional[datetime]:
     """Compute next run time in UTC, honoring schedule.timezone for cron entries."""
     base_utc = from_time or _now_utc()
-    if schedule.cron_expression and croniter is not None:
+    fast = _FAST.get(" ".join(schedule.cron_expression.split())) if schedule.cron_expression else None
+    if schedule.cron_expression and (fast is not None or croniter is not None):
         try:
             tzname = (getattr(schedule, "timezone", None) or "UTC").strip() or "UTC"
             try:
                 tz = ZoneInfo(tzname)
             except Exception:
                 tz = ZoneInfo("UTC")
-            # Use true local "now" in the schedule timezone (aware)
-            local_now = datetime.now(tz)
-            it = croniter(schedule.cron_expression, local_now)
-            next_local = it.get_next(datetime)
-            # Ensure timezone-awareness
-            if next_local.tzinfo is None:
-                next_local = next_local.replace(tzinfo=tz)
+            # croniter is fed naive local wall-clock time; tz-aware input is unreliable across DST
+            local_now = datetime.now(tz).replace(tzinfo=None)
+            if fast is not None:
+                return _localize(fast(local_now), tz).astimezone(timezone.utc)
+            next_local = None
+            with _ITER_LOCK:
+                cached = _ITER_CACHE.get(schedule.id) if schedule.id is not None else None
+                if cached and cached[0] == schedule.cron_expression and cached[1] == tzname:
+                    next_local = cached[2].get_next(datetime)
+                    if next_local <= local_now:
+                        # Iterator is stale (e.g. missed firings); start over from now
+                        next_local = None
+                if next_local is None:
+                    it = croniter(schedule.cron_expression, local_now)
+                    next_local = it.get_next(datetime)
+                    if schedule.id is not None:
+                        _ITER_CACHE[schedule.id] = (schedule.cron_expression, tzname, it)
+            next_local = _localize(next_local, tz)
             # Convert next occurrence back to UTC
             return next_local.astimezone(timezone.utc)
         except Exception as e:
@@ -607,8 +652,10 @@ def _execute_scheduled_script(schedule_id: int):
             
         print(f"DEBUG: APScheduler executing schedule {schedule_id} - script '{script.name}' target_type={schedule.target_type} target_id={schedule.target_id}")
         
-        # Update last_run_at
-        schedule.last_run_at = _now_utc()
+        # Update last_run_at and advance next_run_at once per firing
+        now = _now_utc()
+        schedule.last_run_at = now
+        schedule.next_run_at = _compute_next_run(schedule, now)
         db.commit()
         
         # Get tolerance settings
@@ -679,6 +726,73 @@ def _job_listener(event):
     else:
         print(f"DEBUG: Job {event.job_id} executed successfully")
 
+def _schedule_trigger(schedule: Schedule) -> Optional[CronTrigger]:
+    """Build the APScheduler trigger for a schedule, or None if it has no usable cron"""
+    if not schedule.cron_expression:
+        return None
+    # Parse cron expression
+    parts = schedule.cron_expression.strip().split()
+    if len(parts) != 5:
+        return None
+    minute, hour, day, month, day_of_week = parts
+    
+    # Create CronTrigger with schedule's timezone
+    tzname = (schedule.timezone or 'UTC').strip() or 'UTC'
+    try:
+        tz = ZoneInfo(tzname)
+    except Exception:
+        tz = ZoneInfo('UTC')
+        
+    return CronTrigger(
+        minute=minute,
+        hour=hour,
+        day=day,
+        month=month,
+        day_of_week=day_of_week,
+        timezone=tz
+    )
+
+def _add_schedule_job(schedule: Schedule) -> bool:
+    """Add (or replace) the APScheduler job for one schedule"""
+    try:
+        trigger = _schedule_trigger(schedule)
+        if trigger is None:
+            return False
+        job_id = f"schedule_{schedule.id}"
+        _scheduler.add_job(
+            _execute_scheduled_script,
+            trigger=trigger,
+            args=[schedule.id],
+            id=job_id,
+            replace_existing=True
+        )
+        print(f"DEBUG: Added schedule job {job_id} with cron '{schedule.cron_expression}' in timezone '{schedule.timezone or 'UTC'}'")
+        return True
+    except Exception as e:
+        print(f"ERROR: Failed to add schedule {schedule.id}: {e}")
+        return False
+
+def sync_schedule_one(schedule_id: int, *, deleted: bool = False):
+    """Apply a single schedule change to APScheduler without rebuilding every job"""
+    if not _scheduler or not _scheduler.running:
+        return
+    job_id = f"schedule_{schedule_id}"
+    schedule = None
+    if not deleted:
+        db = SessionLocal()
+        try:
+            schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
+            if schedule and schedule.enabled and _add_schedule_job(schedule):
+                return
+        finally:
+            db.close()
+    # Deleted, disabled or no longer cron-driven: drop the job if present
+    try:
+        if _scheduler.get_job(job_id):
+            _scheduler.remove_job(job_id)
+    except Exception as e:
+        print(f"WARN: Failed to remove schedule job {job_id}: {e}")
+
 def _sync_schedules_to_apscheduler():
     """Sync database schedules to APScheduler jobs"""
     global _scheduler
@@ -697,42 +811,8 @@ def _sync_schedules_to_apscheduler():
         print(f"DEBUG: Syncing {len(schedules)} enabled schedules to APScheduler")
         
         for schedule in schedules:
-            if schedule.cron_expression:
-                try:
-                    # Parse cron expression
-                    parts = schedule.cron_expression.strip().split()
-                    if len(parts) == 5:
-                        minute, hour, day, month, day_of_week = parts
-                        
-                        # Create CronTrigger with schedule's timezone
-                        tzname = (schedule.timezone or 'UTC').strip() or 'UTC'
-                        try:
-                            tz = ZoneInfo(tzname)
-                        except Exception:
-                            tz = ZoneInfo('UTC')
-                            
-                        trigger = CronTrigger(
-                            minute=minute,
-                            hour=hour,
-                            day=day,
-                            month=month,
-                            day_of_week=day_of_week,
-                            timezone=tz
-                        )
-                        
-                        job_id = f"schedule_{schedule.id}"
-                        _scheduler.add_job(
-                            _execute_scheduled_script,
-                            trigger=trigger,
-                            args=[schedule.id],
-                            id=job_id,
-                            replace_existing=True
-                        )
-                        print(f"DEBUG: Added schedule job {job_id} with cron '{schedule.cron_expression}' in timezone '{tzname}'")
-                        
-                except Exception as e:
-                    print(f"ERROR: Failed to add schedule {schedule.id}: {e}")
-                    
+            _add_schedule_job(schedule)
+
         # Add scheduled workflows
         workflows = db.query(Workflow).filter(Workflow.trigger_type == 'schedule', Workflow.schedule_cron.isnot(None)).all()
         print(f"DEBUG: Syncing {len(workflows)} scheduled workflows to APScheduler")
@@ -837,6 +917,30 @@ def sync_schedules():
     if _scheduler and _scheduler.running:
         _sync_schedules_to_apscheduler()
 
+_SYNC_DEBOUNCE_SEC = 0.5
+_sync_timer: Optional[threading.Timer] = None
+_sync_timer_lock = threading.Lock()
+
+
+def _do_debounced_sync():
+    global _sync_timer
+    with _sync_timer_lock:
+        _sync_timer = None
+    try:
+        sync_schedules()
+    except Exception as e:
+        print(f"ERROR: Debounced schedule sync failed: {e}")
+
+def request_sync():
+    """Request a schedule sync; bursts of calls within the debounce window collapse into one rebuild"""
+    global _sync_timer
+    with _sync_timer_lock:
+        if _sync_timer is not None:
+            _sync_timer.cancel()
+        _sync_timer = threading.Timer(_SYNC_DEBOUNCE_SEC, _do_debounced_sync)
+        _sync_timer.daemon = True
+        _sync_timer.start()
+
 def get_next_run_time(workflow_id: int) -> Optional[datetime]:
     """Get next run time for a workflow from APScheduler"""
     global _scheduler
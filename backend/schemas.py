@@ -166,12 +166,20 @@ class ScriptExecutionBase(BaseModel):
 class ScriptExecutionCreate(ScriptExecutionBase):
     pass
 
+class ScriptBatchExecute(BaseModel):
+    server_ids: List[int]
+    timeout_seconds: Optional[int] = Field(default=None, ge=0, le=3600)
+    parameters_used: Optional[str] = None
+
 class ScriptExecutionResponse(ScriptExecutionBase):
     id: int
     executed_by: Optional[int] = None
     status: str
     output: Optional[str] = None
     error: Optional[str] = None
+    # Set by list endpoints that return only a preview of output/error
+    output_truncated: Optional[bool] = None
+    error_truncated: Optional[bool] = None
     started_at: datetime
     completed_at: Optional[datetime] = None
 
@@ -305,7 +313,7 @@ class MarketplaceScriptBase(BaseModel):
     content: str
     script_type: str
     category: Optional[str] = None
-    tags: Optional[str] = None  # JSON array of tags
+    tags: Optional[List[str]] = None
     parameters: Optional[str] = None  # JSON schema for parameters
     version: str = "1.0.0"
     compatibility_notes: Optional[str] = None
@@ -319,7 +327,7 @@ class MarketplaceScriptUpdate(BaseModel):
     content: Optional[str] = None
     script_type: Optional[str] = None
     category: Optional[str] = None
-    tags: Optional[str] = None
+    tags: Optional[List[str]] = None
     parameters: Optional[str] = None
     version: Optional[str] = None
     compatibility_notes: Optional[str] = None
@@ -357,7 +365,7 @@ class ScriptExportRequest(BaseModel):
     script_id: int
     is_public: bool = True
     description: Optional[str] = None
-    tags: Optional[str] = None
+    tags: Optional[List[str]] = None
 
 # Server Health Schemas
 class ServerHealthBase(BaseModel):
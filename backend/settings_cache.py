@@ -0,0 +1,38 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from sqlalchemy.orm import Session
+
+from models import Settings
+
+# Read-mostly singleton: keep a detached snapshot of the Settings row per process.
+# Updates through the settings endpoints invalidate it; other processes pick up
+# changes once the TTL expires.
+SETTINGS_TTL_SECONDS = 30
+
+_settings_cache = {"val": None, "ts": 0.0}
+_lock = threading.Lock()
+
+
+def get_settings_cached(db: Session, ttl: float = SETTINGS_TTL_SECONDS) -> SimpleNamespace:
+    """Return a read-only snapshot of the Settings row, refreshed at most every `ttl` seconds."""
+    now = time.monotonic()
+    with _lock:
+        if _settings_cache["val"] is not None and now - _settings_cache["ts"] < ttl:
+            return _settings_cache["val"]
+    row = db.query(Settings).first()
+    if not row:
+        row = Settings()
+        db.add(row)
+        db.commit()
+        db.refresh(row)
+    snapshot = SimpleNamespace(**{c.name: getattr(row, c.name) for c in Settings.__table__.columns})
+    with _lock:
+        _settings_cache.update(val=snapshot, ts=now)
+    return snapshot
+
+
+def invalidate_settings_cache():
+    with _lock:
+        _settings_cache.update(val=None, ts=0.0)
@@ -0,0 +1,71 @@
+import atexit
+import smtplib
+import threading
+from contextlib import contextmanager
+from typing import Dict, Tuple
+
+# Authenticated SMTP connections keyed by (host, port, user) so repeated
+# digest sends skip the TLS handshake and AUTH round-trips.
+_CONN: Dict[Tuple[str, int, str], smtplib.SMTP] = {}
+_LOCK = threading.Lock()
+
+
+def _quit(conn: smtplib.SMTP) -> None:
+    try:
+        conn.quit()
+    except Exception:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def _is_alive(conn: smtplib.SMTP) -> bool:
+    try:
+        return conn.noop()[0] == 250
+    except Exception:
+        return False
+
+
+def _connect(host: str, port: int, user: str, password: str) -> smtplib.SMTP:
+    conn = smtplib.SMTP(host, port, timeout=15)
+    try:
+        conn.starttls()
+        conn.login(user, password)
+    except Exception:
+        _quit(conn)
+        raise
+    return conn
+
+
+@contextmanager
+def smtp_connection(host: str, port: int, user: str, password: str):
+    """Borrow a cached, health-checked SMTP connection (serialized per process).
+
+    The connection is dropped from the cache if the caller raises, so the next
+    send starts from a fresh handshake.
+    """
+    key = (host, port, user)
+    with _LOCK:
+        conn = _CONN.get(key)
+        if conn is None or not _is_alive(conn):
+            if conn is not None:
+                _quit(conn)
+            conn = _connect(host, port, user, password)
+            _CONN[key] = conn
+        try:
+            yield conn
+        except Exception:
+            _CONN.pop(key, None)
+            _quit(conn)
+            raise
+
+
+def close_all() -> None:
+    with _LOCK:
+        for conn in _CONN.values():
+            _quit(conn)
+        _CONN.clear()
+
+
+atexit.register(close_all)
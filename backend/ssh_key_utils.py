@@ -2,18 +2,32 @@
 SSH Key utilities for configurable key types
 """
 
+import base64
+import os
+import threading
+from functools import lru_cache
+
 from sqlalchemy.orm import Session
-from models import Settings
 from database import SessionLocal
+from settings_cache import get_settings_cached
+
+# Key types in lookup priority order, with the filename suffix each one uses
+_KEY_SUFFIXES = (("rsa", "_id_rsa"), ("ed25519", "_id_ed25519"), ("ecdsa", "_id_ecdsa"))
+
+_key_index = {"dir": None, "mtime": None, "keys": {}}
+_key_index_lock = threading.Lock()
 
 def get_ssh_key_type() -> str:
     """
     Get the configured SSH key type from settings.
     Returns 'rsa' as default if not configured.
+    
+    Reads the cached Settings snapshot, so the database is only hit when the
+    snapshot has expired or been invalidated by a settings update.
     """
     db = SessionLocal()
     try:
-        settings = db.query(Settings).first()
+        settings = get_settings_cached(db)
         if settings and settings.ssh_key_type:
             return settings.ssh_key_type
         return "rsa"  # Default fallback
@@ -22,6 +36,7 @@ def get_ssh_key_type() -> str:
     finally:
         db.close()
 
+@lru_cache(maxsize=None)
 def get_ssh_key_parameters(key_type: str) -> dict:
     """
     Get SSH key generation parameters based on key type.
@@ -30,7 +45,7 @@ def get_ssh_key_parameters(key_type: str) -> dict:
         key_type: The SSH key type ('rsa', 'ed25519', 'ecdsa')
     
     Returns:
-        Dictionary with ssh-keygen parameters
+        Dictionary with ssh-keygen parameters (shared; do not mutate)
     """
     if key_type == "ed25519":
         return {
@@ -54,6 +69,99 @@ def get_ssh_key_parameters(key_type: str) -> dict:
             "file_suffix": "id_rsa"
         }
 
+def create_ssh_key_files(private_key_path, public_key_path, key_params: dict, comment: str) -> tuple:
+    """
+    Generate a key pair in-process and write it the way ssh-keygen would
+    (PEM for RSA, OpenSSH format otherwise; public key as "<type> <b64> <comment>").
+    
+    Args:
+        private_key_path: Where to create the private key (mode 600); must not exist
+        public_key_path: Where to create the public key (mode 644); must not exist
+        key_params: Parameters from get_ssh_key_parameters()
+        comment: Comment appended to the public key
+    
+    Returns:
+        Tuple of (private_key, public_key) file contents
+    """
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+    
+    if key_params["type"] == "ed25519":
+        key = ed25519.Ed25519PrivateKey.generate()
+        private_format = serialization.PrivateFormat.OpenSSH
+    elif key_params["type"] == "ecdsa":
+        curve = {"384": ec.SECP384R1, "521": ec.SECP521R1}.get(key_params["bits"], ec.SECP256R1)
+        key = ec.generate_private_key(curve())
+        private_format = serialization.PrivateFormat.OpenSSH
+    else:
+        key = rsa.generate_private_key(public_exponent=65537, key_size=int(key_params["bits"] or 4096))
+        private_format = serialization.PrivateFormat.TraditionalOpenSSL
+    
+    private_key = key.private_bytes(
+        serialization.Encoding.PEM, private_format, serialization.NoEncryption()
+    ).decode("ascii")
+    public_key = key.public_key().public_bytes(
+        serialization.Encoding.OpenSSH, serialization.PublicFormat.OpenSSH
+    ).decode("ascii") + f" {comment}\n"
+    
+    keys_dir = os.path.dirname(os.fspath(private_key_path))
+    index_mtime = _dir_mtime(keys_dir)
+    _write_new_file(private_key_path, private_key, 0o600)
+    try:
+        _write_new_file(public_key_path, public_key, 0o644)
+    except Exception:
+        os.remove(private_key_path)
+        raise
+    
+    filename = os.path.basename(os.fspath(private_key_path))
+    for key_type, suffix in _KEY_SUFFIXES:
+        if filename.endswith(suffix):
+            key_name = filename[:-len(suffix)]
+            private_path = os.path.join(keys_dir, filename)
+            _update_key_index(keys_dir, index_mtime, key_name, key_type, {
+                "name": key_name,
+                "type": key_type,
+                "private_key_path": private_path,
+                "public_key_path": private_path + ".pub",
+                "public_key": public_key.strip(),
+                "created": os.stat(private_path).st_mtime,
+            })
+            break
+    return private_key, public_key
+
+def remove_ssh_key_files(private_key_path) -> list:
+    """
+    Delete a key pair (private key and its .pub) and drop it from the key index.
+    
+    Returns:
+        The paths that were actually removed
+    """
+    private_path = os.fspath(private_key_path)
+    keys_dir = os.path.dirname(private_path)
+    index_mtime = _dir_mtime(keys_dir)
+    removed = []
+    for path in (private_path, private_path + ".pub"):
+        try:
+            os.remove(path)
+            removed.append(path)
+        except FileNotFoundError:
+            pass
+    
+    filename = os.path.basename(private_path)
+    for key_type, suffix in _KEY_SUFFIXES:
+        if filename.endswith(suffix):
+            _update_key_index(keys_dir, index_mtime, filename[:-len(suffix)], key_type, None)
+            break
+    return removed
+
+def _write_new_file(path, content: str, mode: int):
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, mode)
+    try:
+        os.fchmod(fd, mode)
+        os.write(fd, content.encode("ascii"))
+    finally:
+        os.close(fd)
+
 def get_paramiko_key_class(key_type: str):
     """
     Get the appropriate Paramiko key class for the given key type.
@@ -88,7 +196,12 @@ def detect_key_type_from_file(file_path: str) -> str:
             content = f.read()
         
         if "BEGIN OPENSSH PRIVATE KEY" in content:
-            # OpenSSH format - try to detect type
+            # OpenSSH format - the key type name sits inside the base64 body
+            body = "".join(line for line in content.splitlines() if line and not line.startswith("-----"))
+            try:
+                content = base64.b64decode(body)[:200].decode("latin-1")
+            except Exception:
+                pass
             if "ed25519" in content.lower():
                 return "ed25519"
             elif "ecdsa" in content.lower():
@@ -103,3 +216,108 @@ def detect_key_type_from_file(file_path: str) -> str:
             return "rsa"  # Default fallback
     except Exception:
         return "rsa"  # Default fallback
+
+def ssh_key_index(keys_dir: str = "ssh_keys") -> dict:
+    """
+    Index the key pairs in keys_dir as {key_name: {key_type: entry}}.
+    
+    Built with a single os.scandir pass and reused until the directory's
+    mtime changes (i.e. a key file is added, removed or renamed).
+    
+    Returns:
+        Mapping of key name to per-type entries with name, type,
+        private_key_path, public_key_path, public_key and created
+    """
+    try:
+        mtime = os.stat(keys_dir).st_mtime_ns
+    except OSError:
+        return {}
+    if _key_index["dir"] == keys_dir and _key_index["mtime"] == mtime:
+        return _key_index["keys"]
+    
+    with _key_index_lock:
+        if _key_index["dir"] == keys_dir and _key_index["mtime"] == mtime:
+            return _key_index["keys"]
+        
+        privates = {}
+        publics = set()
+        with os.scandir(keys_dir) as it:
+            for entry in it:
+                name = entry.name
+                if name.endswith(".pub"):
+                    publics.add(name[:-4])
+                    continue
+                for key_type, suffix in _KEY_SUFFIXES:
+                    if name.endswith(suffix):
+                        privates[name] = (name[:-len(suffix)], key_type, entry.stat(follow_symlinks=False).st_mtime)
+                        break
+        
+        keys = {}
+        for filename, (key_name, key_type, created) in privates.items():
+            if filename not in publics:
+                continue
+            private_path = os.path.join(keys_dir, filename)
+            try:
+                with open(private_path + ".pub", "r") as f:
+                    public_key = f.read().strip()
+            except OSError:
+                continue
+            keys.setdefault(key_name, {})[key_type] = {
+                "name": key_name,
+                "type": key_type,
+                "private_key_path": private_path,
+                "public_key_path": private_path + ".pub",
+                "public_key": public_key,
+                "created": created,
+            }
+        
+        _key_index.update(dir=keys_dir, mtime=mtime, keys=keys)
+        return keys
+
+def _dir_mtime(keys_dir: str):
+    try:
+        return os.stat(keys_dir).st_mtime_ns
+    except OSError:
+        return None
+
+def _update_key_index(keys_dir: str, index_mtime, key_name: str, key_type: str, entry):
+    """
+    Apply a single add (entry) or removal (entry=None) to the cached index.
+    
+    Only done if the index was current as of index_mtime (taken before the
+    files changed); otherwise the next ssh_key_index() call rebuilds it.
+    The dict is replaced rather than mutated so readers never see it change.
+    """
+    with _key_index_lock:
+        if (
+            index_mtime is None
+            or _key_index["mtime"] != index_mtime
+            or os.path.normpath(_key_index["dir"]) != os.path.normpath(keys_dir or ".")
+        ):
+            return
+        keys = dict(_key_index["keys"])
+        by_type = dict(keys.get(key_name, {}))
+        if entry is None:
+            by_type.pop(key_type, None)
+        else:
+            by_type[key_type] = entry
+        if by_type:
+            keys[key_name] = by_type
+        else:
+            keys.pop(key_name, None)
+        _key_index.update(mtime=_dir_mtime(keys_dir), keys=keys)
+
+def find_ssh_key(key_name: str, keys_dir: str = "ssh_keys"):
+    """
+    Look up a key pair by name, preferring rsa, then ed25519, then ecdsa.
+    
+    Returns:
+        The index entry for the key, or None if no complete pair exists
+    """
+    by_type = ssh_key_index(keys_dir).get(key_name)
+    if not by_type:
+        return None
+    for key_type, _ in _KEY_SUFFIXES:
+        if key_type in by_type:
+            return by_type[key_type]
+    return None
@@ -4,9 +4,11 @@ from typing import Optional
 from rq import get_current_job
 import paramiko
 
-from database import SessionLocal
+from database import SessionLocal, commit_fast
 from models import Script, Server, ScriptExecution, Settings
 from ssh_script_executor import execute_script_on_server
+from ssh_manager import SSHConnectionError
+from auth_logger import auth_logger
 from utils_backoff import retry_with_backoff
 from utils_logging import get_logger, kv
 from rq_queue import semaphore_try_acquire, semaphore_release
@@ -24,7 +26,7 @@ def _get_max_concurrency(sess: SessionLocal) -> int:
 
 
 @retry_with_backoff((paramiko.ssh_exception.SSHException, OSError, TimeoutError), retries=5, base=0.3, factor=2.0)
-def _exec_once(script_id: int, server_id: int, executed_by: Optional[int], per_server_timeout: Optional[int]):
+def _exec_once(script_id: int, server_id: int, executed_by: Optional[int], per_server_timeout: Optional[int], execution_id: Optional[int] = None):
     sess = SessionLocal()
     try:
         # Acquire global semaphore
@@ -37,25 +39,44 @@ def _exec_once(script_id: int, server_id: int, executed_by: Optional[int], per_s
         server = sess.query(Server).get(server_id)
         if not script or not server:
             raise RuntimeError("script_or_server_not_found")
-        # Create execution row centrally in the task
-        exec_row = ScriptExecution(
-            script_id=script.id,
-            server_id=server.id,
-            executed_by=executed_by,
-            parameters_used=None,
-            status="running",
-            started_at=datetime.now(timezone.utc),
-        )
-        try:
-            exec_row.id = None
-        except Exception:
-            pass
-        sess.add(exec_row)
-        sess.commit()
-        sess.refresh(exec_row)
+        exec_row = sess.get(ScriptExecution, execution_id) if execution_id else None
+        if exec_row is not None:
+            if exec_row.status not in ("queued", "running", "long_running"):
+                # Cancelled (or otherwise finished) before a worker picked it up
+                return exec_row.id, exec_row.status
+            if exec_row.status == "queued":
+                # Row was pre-created by the API; claim it only if it is still
+                # queued, so a cancel that lands in between is not overwritten
+                claimed = sess.query(ScriptExecution).filter(
+                    ScriptExecution.id == exec_row.id,
+                    ScriptExecution.status == "queued",
+                ).update({"status": "running"}, synchronize_session=False)
+                sess.commit()
+                if not claimed:
+                    return exec_row.id, exec_row.status
+        else:
+            # Create execution row centrally in the task
+            exec_row = ScriptExecution(
+                script_id=script.id,
+                server_id=server.id,
+                executed_by=executed_by,
+                parameters_used=None,
+                status="running",
+                started_at=datetime.now(timezone.utc),
+            )
+            try:
+                exec_row.id = None
+            except Exception:
+                pass
+            sess.add(exec_row)
+            sess.commit()
+            sess.refresh(exec_row)
 
-        # Infinite detection and settings
-        is_infinite = (script.per_server_timeout_seconds == 0)
+        # Infinite detection (0 = no timeout; per-request override wins) and settings
+        if per_server_timeout is not None:
+            is_infinite = (per_server_timeout == 0)
+        else:
+            is_infinite = (script.per_server_timeout_seconds == 0)
         settings = sess.query(Settings).first()
         if not settings:
             settings = Settings()
@@ -65,12 +86,31 @@ def _exec_once(script_id: int, server_id: int, executed_by: Optional[int], per_s
         virtual_timeout_duration = settings.virtual_timeout_duration or 60
 
         # Execute via shared SSH executor. It updates exec_row in-place.
-        out, err, exit_code = execute_script_on_server(
-            script=script,
-            server=server,
-            execution=exec_row,
-            is_infinite=is_infinite,
-            virtual_timeout_duration=virtual_timeout_duration,
+        try:
+            out, err, exit_code = execute_script_on_server(
+                script=script,
+                server=server,
+                execution=exec_row,
+                is_infinite=is_infinite,
+                virtual_timeout_duration=virtual_timeout_duration,
+            )
+        except SSHConnectionError as e:
+            auth_logger.log_script_execution_auth(
+                script_name=script.name,
+                server_name=server.name,
+                server_ip=server.ip,
+                auth_method_used="ssh_manager",
+                success=False,
+                details={"error": str(e), "user_id": executed_by},
+            )
+            raise
+        auth_logger.log_script_execution_auth(
+            script_name=script.name,
+            server_name=server.name,
+            server_ip=server.ip,
+            auth_method_used="ssh_manager",
+            success=True,
+            details={"user_id": executed_by},
         )
 
         if not exec_row.completed_at and not is_infinite:
@@ -95,13 +135,16 @@ def _exec_once(script_id: int, server_id: int, executed_by: Optional[int], per_s
             pass
 
 
-def execute_script_job(script_id: int, server_id: int, executed_by: Optional[int] = None, request_id: Optional[str] = None):
+def execute_script_job(script_id: int, server_id: int, executed_by: Optional[int] = None, request_id: Optional[str] = None,
+                       execution_id: Optional[int] = None, timeout_seconds: Optional[int] = None):
+    """Run a script on one server. When execution_id is given, that pre-created row is
+    updated in place instead of inserting a new one."""
     job = get_current_job() if get_current_job else None
     logger = get_logger(__name__, run_id=None, request_id=request_id or (job.id if job else None))
-    logger.info(f"enqueue_execute start {kv(script_id=script_id, server_id=server_id)}")
+    logger.info(f"enqueue_execute start {kv(script_id=script_id, server_id=server_id, execution_id=execution_id)}")
 
     try:
-        exec_id, status = _exec_once(script_id, server_id, executed_by, None)
+        exec_id, status = _exec_once(script_id, server_id, executed_by, timeout_seconds, execution_id)
         # Re-fetch the execution row to ensure we return the finalized status
         sess = SessionLocal()
         try:
@@ -117,6 +160,14 @@ def execute_script_job(script_id: int, server_id: int, executed_by: Optional[int
         # create failed row if nothing returned
         sess = SessionLocal()
         try:
+            se = sess.get(ScriptExecution, execution_id) if execution_id else None
+            if se is not None:
+                se.status = "failed"
+                se.error = str(e)
+                se.completed_at = datetime.now(timezone.utc)
+                sess.commit()
+                logger.error(f"enqueue_execute error {kv(error=str(e), execution_id=se.id)}")
+                return {"execution_id": se.id, "status": "failed", "error": str(e)}
             se = ScriptExecution(
                 script_id=script_id,
                 server_id=server_id,
@@ -133,3 +184,18 @@ def execute_script_job(script_id: int, server_id: int, executed_by: Optional[int
         finally:
             try: sess.close()
             except Exception: pass
+
+
+def mark_long_running_task(execution_id: int):
+    """Flip a still-running execution to long_running; enqueued with a delay by execute_script."""
+    logger = get_logger(__name__)
+    sess = SessionLocal()
+    try:
+        ex = sess.get(ScriptExecution, execution_id)
+        if ex and ex.status == "running":
+            ex.status = "long_running"
+            commit_fast(sess)
+            logger.info(f"marked long_running {kv(execution_id=execution_id)}")
+    finally:
+        try: sess.close()
+        except Exception: pass
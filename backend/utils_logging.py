@@ -1,7 +1,38 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 from typing import Optional
 
+# Records are handed to a queue on the calling thread; a single QueueListener
+# thread does the (potentially slow) stdout writes. That thread only exists in
+# the process that started it: forked children such as RQ work horses (which
+# also exit via os._exit, skipping atexit) write straight to the stream.
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_listener: Optional[logging.handlers.QueueListener] = None
+_listener_pid: Optional[int] = None
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+
+
+class _ListenerQueueHandler(logging.handlers.QueueHandler):
+    def emit(self, record: logging.LogRecord) -> None:
+        if os.getpid() == _listener_pid:
+            super().emit(record)
+        else:
+            _stream_handler.handle(record)
+
+
+def _ensure_listener() -> None:
+    global _listener, _listener_pid
+    if _listener is not None:
+        return
+    _listener = logging.handlers.QueueListener(_log_queue, _stream_handler, respect_handler_level=True)
+    _listener.start()
+    _listener_pid = os.getpid()
+    atexit.register(_listener.stop)
+
 
 def get_logger(name: str = __name__, run_id: Optional[int] = None, request_id: Optional[str] = None) -> logging.LoggerAdapter:
     logger = logging.getLogger(name)
@@ -9,10 +40,8 @@ def get_logger(name: str = __name__, run_id: Optional[int] = None, request_id: O
     logger.setLevel(getattr(logging, level, logging.INFO))
     # Avoid duplicate handlers in hot reload
     if not logger.handlers:
-        handler = logging.StreamHandler()
-        fmt = "%(asctime)s %(levelname)s %(name)s %(message)s"
-        handler.setFormatter(logging.Formatter(fmt))
-        logger.addHandler(handler)
+        _ensure_listener()
+        logger.addHandler(_ListenerQueueHandler(_log_queue))
     extra = {"run_id": run_id, "request_id": request_id}
     return logging.LoggerAdapter(logger, extra)
 
@@ -726,7 +726,7 @@ const Dashboard = () => {
                                         <tr key={ex.id}>
                                           <td>{ex.script?.name || scriptNameById[ex.script_id] || ex.script_id}</td>
                                           <td>{ex.server?.name || serverNameById[ex.server_id] || ex.server_id}</td>
-                                          <td><span className={`badge ${ex.status==='completed'?'bg-success':ex.status==='running'?'bg-warning':'bg-danger'}`}>{ex.status}</span></td>
+                                          <td><span className={`badge ${ex.status==='completed'?'bg-success':ex.status==='running'?'bg-warning':ex.status==='queued'?'bg-info':'bg-danger'}`}>{ex.status}</span></td>
                                           <td>{ex.started_at ? formatLocal(ex.started_at) : '—'}</td>
                                         </tr>
                                         );
@@ -75,6 +75,17 @@ const Executions = () => {
     setExpandedExecIds(prev => prev.includes(sid) ? prev.filter(x => x !== sid) : [...prev, sid]);
   };
 
+  // List endpoints only return a preview of stdout/stderr; full text is fetched on demand
+  const [fullText, setFullText] = useState({}); // { [`${execId}:${stream}`]: text }
+  const loadFullText = async (execId, stream) => {
+    try {
+      const res = await axios.get(`/api/scripts/executions/${execId}/output`, { params: { stream }, responseType: 'text' });
+      setFullText(prev => ({ ...prev, [`${execId}:${stream}`]: res.data }));
+    } catch (e) {
+      console.error(e);
+    }
+  };
+
   // Live streaming state per execution
   const [liveStreams, setLiveStreams] = useState({}); // { [execId]: { ws, lines: [], status } }
   const startLiveStream = (ex) => {
@@ -195,6 +206,7 @@ const Executions = () => {
   const statusOptions = useMemo(() => (
     [
       { id: 'completed', name: 'Completed' },
+      { id: 'queued', name: 'Queued' },
       { id: 'running', name: 'Running' },
       { id: 'long_running', name: 'Long Running' },
       { id: 'cancelled', name: 'Cancelled' },
@@ -386,7 +398,7 @@ const Executions = () => {
                           })()}
                         </td>
                         <td>
-                          <span className={`badge ${ex.status === 'completed' ? 'bg-success' : ex.status === 'running' ? 'bg-warning' : ex.status === 'long_running' ? 'bg-warning' : ex.status === 'cancelled' ? 'bg-secondary' : 'bg-danger'}`}>{ex.status}</span>
+                          <span className={`badge ${ex.status === 'completed' ? 'bg-success' : ex.status === 'running' ? 'bg-warning' : ex.status === 'long_running' ? 'bg-warning' : ex.status === 'cancelled' ? 'bg-secondary' : ex.status === 'queued' ? 'bg-info' : 'bg-danger'}`}>{ex.status}</span>
                         </td>
                         <td title={ex.server?.timezone ? `Server TZ: ${ex.server.timezone}` : ''}>{formatInTimezone(ex.started_at, ex.server?.timezone)}</td>
                         <td title={ex.server?.timezone ? `Server TZ: ${ex.server.timezone}` : ''}>{formatInTimezone(ex.completed_at, ex.server?.timezone)}</td>
@@ -401,7 +413,7 @@ const Executions = () => {
                               <i className="bi bi-chevron-down me-1" style={{transform: isExpanded(ex.id) ? 'rotate(180deg)' : 'none', transition:'transform .2s'}}></i>
                               Details
                             </button>
-                            {(ex.status === 'running' || ex.status === 'long_running') && (
+                            {(ex.status === 'queued' || ex.status === 'running' || ex.status === 'long_running') && (
                               <button
                                 type="button"
                                 className="btn btn-outline-danger btn-sm"
@@ -430,14 +442,20 @@ const Executions = () => {
                                 <div className="col-12 col-lg-6">
                                   <h6 className="mb-2">Stdout</h6>
                                   <pre className="p-2" style={{minHeight:'140px', background:'var(--bg-tertiary)', color:'var(--text-primary)', border:'1px solid var(--border-primary)', borderRadius:'4px', whiteSpace:'pre-wrap'}}>
-                                    {ex.output ? String(ex.output) : '—'}
+                                    {fullText[`${ex.id}:output`] ?? (ex.output ? String(ex.output) : '—')}
                                   </pre>
+                                  {ex.output_truncated && fullText[`${ex.id}:output`] === undefined && (
+                                    <button className="btn btn-sm btn-link p-0" onClick={()=> loadFullText(ex.id, 'output')}>Load full output</button>
+                                  )}
                                 </div>
                                 <div className="col-12 col-lg-6">
                                   <h6 className="mb-2">Stderr</h6>
                                   <pre className="p-2" style={{minHeight:'140px', background:'var(--bg-tertiary)', color:'var(--text-primary)', border:'1px solid var(--border-primary)', borderRadius:'4px', whiteSpace:'pre-wrap'}}>
-                                    {ex.error ? String(ex.error) : '—'}
+                                    {fullText[`${ex.id}:error`] ?? (ex.error ? String(ex.error) : '—')}
                                   </pre>
+                                  {ex.error_truncated && fullText[`${ex.id}:error`] === undefined && (
+                                    <button className="btn btn-sm btn-link p-0" onClick={()=> loadFullText(ex.id, 'error')}>Load full output</button>
+                                  )}
                                 </div>
                               </div>
                               <div className="mt-3">
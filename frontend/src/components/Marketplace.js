@@ -60,7 +60,8 @@ const Marketplace = () => {
       params.set('size', String(pagination.size));
 
       // Append only non-empty filters
-      if (filters.search && filters.search.trim()) params.set('search', filters.search.trim());
+      // Backend requires at least 3 characters for a search term
+      if (filters.search && filters.search.trim().length >= 3) params.set('search', filters.search.trim());
       if (filters.category) params.set('category', filters.category);
       if (filters.script_type) params.set('script_type', filters.script_type);
       if (filters.tags && filters.tags.trim()) params.set('tags', filters.tags.trim());
@@ -292,7 +293,7 @@ const Marketplace = () => {
     if (!tagsString) return null;
     
     try {
-      const tagList = JSON.parse(tagsString);
+      const tagList = Array.isArray(tagsString) ? tagsString : JSON.parse(tagsString);
       return tagList.map((tag, index) => (
         <span key={index} className="badge bg-secondary me-1 mb-1">
           {tag}
@@ -326,7 +327,7 @@ const Marketplace = () => {
     if (script.description && script.description.toLowerCase().includes(searchTerm)) matches++;
     if (script.content && script.content.toLowerCase().includes(searchTerm)) matches++;
     if (script.category && script.category.toLowerCase().includes(searchTerm)) matches++;
-    if (script.tags && script.tags.toLowerCase().includes(searchTerm)) matches++;
+    if (script.tags && [].concat(script.tags).join(' ').toLowerCase().includes(searchTerm)) matches++;
     
     return matches;
   };
@@ -144,7 +144,7 @@ echo "Frontend (dev):"
 echo "  cd $FRONTEND_DIR && npm start"
 echo ""
 echo "Start RQ workers (8 workers, 2 queues: execute default):"
-echo "  cd $BACKEND_DIR && source venv/bin/activate && export REDIS_URL=$REDIS_URL PYTHONPATH=$BACKEND_DIR; for i in \$(seq 1 8); do RQ_WORKER_NAME=sm-\$i nohup ./venv/bin/rq worker execute default > worker_\$i.log 2>&1 & done"
+echo "  cd $BACKEND_DIR && source venv/bin/activate && export REDIS_URL=$REDIS_URL PYTHONPATH=$BACKEND_DIR; for i in \$(seq 1 8); do RQ_WORKER_NAME=sm-\$i nohup ./venv/bin/rq worker --with-scheduler execute default > worker_\$i.log 2>&1 & done"
 echo ""
 echo "Check workers:"
 echo "  cd $BACKEND_DIR && ./venv/bin/rq info --url $REDIS_URL"
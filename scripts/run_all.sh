@@ -61,7 +61,7 @@ BACKEND_CMD="cd $BACKEND_DIR && source $VENV_DIR/bin/activate && PYTHONUNBUFFERE
 # Frontend (ensure deps, run on HOST:0.0.0.0 PORT:3000, avoid auto-opening browser)
 FRONTEND_CMD="cd $FRONTEND_DIR && ([ -d node_modules ] || npm ci --no-audit --no-fund) && HOST=0.0.0.0 PORT=9753 BROWSER=none npm start"
 # Workers (8)
-WORKER_CMD="cd $BACKEND_DIR && source $VENV_DIR/bin/activate && export DATABASE_URL=\"${DATABASE_URL}\" REDIS_URL=\"${REDIS_URL}\" PYTHONPATH=\"$BACKEND_DIR\"; rq worker execute default"
+WORKER_CMD="cd $BACKEND_DIR && source $VENV_DIR/bin/activate && export DATABASE_URL=\"${DATABASE_URL}\" REDIS_URL=\"${REDIS_URL}\" PYTHONPATH=\"$BACKEND_DIR\"; rq worker --with-scheduler execute default"
 
 if command_exists tmux; then
   SESSION="sm-dev"